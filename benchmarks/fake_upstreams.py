@@ -0,0 +1,234 @@
+"""Local stand-ins for the Blizzard, Battle.net OAuth and Raider.IO APIs.
+
+One aiohttp app serves all three under different path prefixes:
+
+- ``/oauth/token``
+- ``/blizzard/...`` (profile + game data routes the bot uses)
+- ``/raiderio/...``
+
+Latency, error rate and payload size are configurable, and every request is
+counted per route so the benchmark can report upstream calls per command.
+``serve_in_subprocess`` runs them in their own process, so their CPU time
+doesn't compete with the client being measured; the counts are then read
+and reset over ``/_bench/calls``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import multiprocessing as mp
+import random
+from collections import Counter
+from collections.abc import Callable
+from dataclasses import dataclass
+from multiprocessing.connection import Connection
+from multiprocessing.process import BaseProcess
+
+from aiohttp import web
+
+
+@dataclass
+class UpstreamProfile:
+    latency_ms: float = 80.0
+    jitter_ms: float = 20.0
+    error_rate: float = 0.0  # fraction of data requests answered with 503
+    payload_kb: float = 0.0  # extra padding added to character payloads
+    realms: int = 250
+    seed: int = 1234
+
+
+class FakeUpstreams:
+    def __init__(self, profile: UpstreamProfile | None = None):
+        self.profile = profile or UpstreamProfile()
+        self.calls: Counter[str] = Counter()
+        self._rng = random.Random(self.profile.seed)
+        self._runner: web.AppRunner | None = None
+        self.port: int | None = None
+        self._padding = "x" * int(self.profile.payload_kb * 1024)
+
+    # -----------------------------
+    # Lifecycle
+    # -----------------------------
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        app = web.Application()
+        r = app.router
+        r.add_post("/oauth/token", self._token)
+        r.add_get("/blizzard/profile/wow/character/{realm}/{name}", self._profile)
+        r.add_get("/blizzard/profile/wow/character/{realm}/{name}/equipment", self._equipment)
+        r.add_get("/blizzard/profile/wow/character/{realm}/{name}/statistics", self._statistics)
+        r.add_get("/blizzard/profile/wow/character/{realm}/{name}/character-media", self._media)
+        r.add_get("/blizzard/data/wow/realm/index", self._realm_index)
+        r.add_get("/blizzard/data/wow/realm/{id}", self._realm)
+        r.add_get("/blizzard/data/wow/connected-realm/{id}", self._connected_realm)
+        r.add_get("/blizzard/data/wow/search/connected-realm", self._connected_realm_search)
+        r.add_get("/raiderio/characters/profile", self._raiderio_profile)
+        r.add_get("/_bench/calls", self._bench_calls)
+        r.add_delete("/_bench/calls", self._bench_reset)
+
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]  # type: ignore[union-attr]
+        return f"http://{host}:{self.port}"
+
+    async def close(self) -> None:
+        if self._runner:
+            await self._runner.cleanup()
+
+    def reset_counts(self) -> None:
+        self.calls.clear()
+
+    async def _bench_calls(self, _request: web.Request) -> web.Response:
+        return web.json_response(dict(self.calls))
+
+    async def _bench_reset(self, _request: web.Request) -> web.Response:
+        self.reset_counts()
+        return web.Response(status=204)
+
+    # -----------------------------
+    # Helpers
+    # -----------------------------
+    async def _simulate(self, request: web.Request, *, can_fail: bool = True) -> None:
+        route = request.match_info.route.resource.canonical if request.match_info.route.resource else request.path
+        self.calls[route] += 1
+        p = self.profile
+        delay = max(0.0, self._rng.gauss(p.latency_ms, p.jitter_ms)) / 1000
+        await asyncio.sleep(delay)
+        if can_fail and p.error_rate and self._rng.random() < p.error_rate:
+            raise web.HTTPServiceUnavailable()
+
+    # -----------------------------
+    # OAuth
+    # -----------------------------
+    async def _token(self, request: web.Request) -> web.Response:
+        # Error injection targets the data APIs; a dead token endpoint ends the run
+        await self._simulate(request, can_fail=False)
+        return web.json_response({"access_token": "bench-token", "token_type": "bearer", "expires_in": 86399})
+
+    # -----------------------------
+    # Blizzard
+    # -----------------------------
+    async def _profile(self, request: web.Request) -> web.Response:
+        await self._simulate(request)
+        name = request.match_info["name"]
+        return web.json_response({
+            "name": name.title(),
+            "level": 80,
+            "character_class": {"id": 8, "name": "Mago"},
+            "race": {"name": "Humano"},
+            "faction": {"name": "Alianza"},
+            "active_spec": {"name": "Escarcha"},
+            "guild": {"name": "Bench Guild"},
+            "equipped_item_level": 615,
+        })
+
+    async def _equipment(self, request: web.Request) -> web.Response:
+        await self._simulate(request)
+        items = [
+            {
+                "slot": {"type": f"SLOT_{i}", "name": f"Ranura {i}"},
+                "item": {"id": 200000 + i},
+                "level": {"value": 610 + i % 10},
+                "name": f"Objeto {i}",
+                "stats": [{"type": {"type": "STAMINA", "name": "Aguante"}, "value": 1000 + i}] * 6,
+            }
+            for i in range(16)
+        ]
+        return web.json_response({"equipped_item_level": 615, "equipped_items": items, "_padding": self._padding})
+
+    async def _statistics(self, request: web.Request) -> web.Response:
+        await self._simulate(request)
+        return web.json_response({"average_item_level": 617, "average_item_level_equipped": 615})
+
+    async def _media(self, request: web.Request) -> web.Response:
+        await self._simulate(request)
+        return web.json_response({"assets": [{"key": "avatar", "value": "https://render.example/avatar.jpg"}]})
+
+    async def _realm_index(self, request: web.Request) -> web.Response:
+        await self._simulate(request)
+        realms = [{"id": i, "slug": f"realm-{i}", "name": f"Realm {i}"} for i in range(1, self.profile.realms + 1)]
+        return web.json_response({"realms": realms})
+
+    async def _realm(self, request: web.Request) -> web.Response:
+        await self._simulate(request)
+        realm_id = int(request.match_info["id"])
+        cr_id = 1000 + realm_id // 3
+        return web.json_response({
+            "id": realm_id,
+            "connected_realm": {"href": f"https://bench/data/wow/connected-realm/{cr_id}?namespace=dynamic-eu"},
+        })
+
+    async def _connected_realm(self, request: web.Request) -> web.Response:
+        await self._simulate(request)
+        cr_id = int(request.match_info["id"])
+        base = (cr_id - 1000) * 3
+        return web.json_response({
+            "id": cr_id,
+            "status": {"type": "UP"},
+            "realms": [{"id": base + i} for i in range(3)],
+        })
+
+    async def _connected_realm_search(self, request: web.Request) -> web.Response:
+        await self._simulate(request)
+        results = []
+        for cr_id in range(1000, 1000 + self.profile.realms // 3 + 1):
+            members = [{"id": (cr_id - 1000) * 3 + i} for i in range(3)]
+            results.append({"data": {"id": cr_id, "status": {"type": "UP"}, "realms": members}})
+        return web.json_response({"pageCount": 1, "results": results})
+
+    # -----------------------------
+    # Raider.IO
+    # -----------------------------
+    async def _raiderio_profile(self, request: web.Request) -> web.Response:
+        await self._simulate(request)
+        runs = [
+            {"keystone_level": 10 + i % 8, "timed": i % 3 != 0, "dungeon": {"name": f"Mazmorra {i}"}}
+            for i in range(8)
+        ]
+        return web.json_response({
+            "mythic_plus_scores_by_season": [{"scores": {"all": 2450.3}}],
+            "mythic_plus_best_runs": runs,
+            "raid_progression": {
+                "bench-raid": {"name": "Bench Raid", "summary": "6/8 M", "total_bosses": 8},
+            },
+            "_padding": self._padding,
+        })
+
+
+# -----------------------------
+# Out-of-process server
+# -----------------------------
+def _serve(profile: UpstreamProfile, conn: Connection) -> None:
+    async def main() -> None:
+        upstreams = FakeUpstreams(profile)
+        conn.send(await upstreams.start())
+        # Serve until the parent says stop (or goes away)
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, conn.recv)
+        except EOFError:
+            pass
+        await upstreams.close()
+
+    asyncio.run(main())
+
+
+def serve_in_subprocess(profile: UpstreamProfile) -> tuple[str, Callable[[], None]]:
+    """Start the fakes in a child process; returns (base URL, stop function)."""
+    ctx = mp.get_context("spawn")
+    parent, child = ctx.Pipe()
+    proc: BaseProcess = ctx.Process(target=_serve, args=(profile, child), name="fake-upstreams", daemon=True)
+    proc.start()
+    base = parent.recv()
+
+    def stop() -> None:
+        try:
+            parent.send("stop")
+        except OSError:
+            pass
+        proc.join(timeout=5)
+        if proc.is_alive():
+            proc.kill()
+
+    return base, stop
+
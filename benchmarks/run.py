@@ -0,0 +1,231 @@
+"""Latency/throughput benchmark against local fake upstreams (fully offline).
+
+Usage (from the repo root, with the package installed or ``src`` on PYTHONPATH)::
+
+    python -m benchmarks.run --scenario character --requests 500 --concurrency 50
+    python -m benchmarks.run --scenario realm --latency-ms 120 --json
+
+Reports p50/p95/p99 latency, throughput, upstream calls per command and peak
+RSS, so runs can be compared between commits. The fakes run in their own
+process and every scenario in a fresh one, so neither the servers' CPU time
+nor an earlier scenario's memory shows up in a scenario's numbers.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import multiprocessing as mp
+import random
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+
+import aiohttp
+
+from gwydeonbot.clients.blizzard_api import BlizzardApiClient
+from gwydeonbot.clients.blizzard_oauth import BlizzardOAuthClient
+from gwydeonbot.clients.raiderio_api import RaiderIoClient
+from gwydeonbot.clients.transport import HttpTransport, TransportConfig
+from gwydeonbot.domain.errors import WowApiError
+from gwydeonbot.services.character_service import CharacterService
+from gwydeonbot.services.realm_service import RealmService
+from gwydeonbot.utils.ratelimit import RateLimiter
+
+from .fake_upstreams import UpstreamProfile, serve_in_subprocess
+
+
+@dataclass
+class Report:
+    scenario: str
+    requests: int
+    concurrency: int
+    errors: int  # WowApiError: degraded answers the bot handles
+    unexpected_errors: int  # anything else: bugs worth a look
+    wall_seconds: float
+    throughput_rps: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    max_ms: float
+    upstream_calls: int
+    upstream_calls_per_command: float
+    peak_rss_mb: float
+
+
+def _percentile(sorted_values: list[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    k = min(len(sorted_values) - 1, max(0, round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[k]
+
+
+def _peak_rss_mb() -> float:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+async def _drive(n: int, concurrency: int, make_call) -> tuple[list[float], int, int, float]:
+    latencies: list[float] = []
+    errors = unexpected = 0
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one(i: int) -> None:
+        nonlocal errors, unexpected
+        async with sem:
+            t = time.perf_counter()
+            try:
+                await make_call(i)
+            except WowApiError:
+                errors += 1
+            except Exception as e:
+                if not unexpected:
+                    print(f"unexpected error: {e!r}", file=sys.stderr)
+                unexpected += 1
+            latencies.append(time.perf_counter() - t)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(n)))
+    return latencies, errors, unexpected, time.perf_counter() - start
+
+
+async def _upstream_calls(session: aiohttp.ClientSession, base: str, *, reset: bool = False) -> int:
+    async with session.request("DELETE" if reset else "GET", f"{base}/_bench/calls") as resp:
+        return 0 if reset else sum((await resp.json()).values())
+
+
+def run(args: argparse.Namespace) -> list[Report]:
+    base, stop = serve_in_subprocess(
+        UpstreamProfile(
+            latency_ms=args.latency_ms,
+            jitter_ms=args.jitter_ms,
+            error_rate=args.error_rate,
+            payload_kb=args.payload_kb,
+            realms=args.realms,
+        )
+    )
+    scenarios = ["character", "realm"] if args.scenario == "both" else [args.scenario]
+    reports: list[Report] = []
+    try:
+        for scenario in scenarios:
+            # A fresh process per scenario: its peak RSS is this scenario's alone
+            with ProcessPoolExecutor(max_workers=1, mp_context=mp.get_context("spawn")) as pool:
+                reports.append(pool.submit(_run_scenario, scenario, args, base).result())
+    finally:
+        stop()
+    return reports
+
+
+def _run_scenario(scenario: str, args: argparse.Namespace, base: str) -> Report:
+    return asyncio.run(_scenario(scenario, args, base))
+
+
+async def _scenario(scenario: str, args: argparse.Namespace, base: str) -> Report:
+    control = aiohttp.ClientSession()
+    transport = HttpTransport(TransportConfig(limit_per_host=args.pool_size))
+
+    def unlimited(name: str) -> RateLimiter:
+        # Measure the bot, not the quota
+        return RateLimiter.per_minute(name, 10**9, burst=10**9)
+
+    oauth = BlizzardOAuthClient(transport.session("oauth"), "bench", "bench", token_url=f"{base}/oauth/token")
+    blizzard = BlizzardApiClient(
+        transport.session("blizzard"),
+        oauth,
+        region="eu",
+        locale="es_ES",
+        limiter=unlimited("blizzard"),
+        timeout=transport.timeout,
+        base_url=f"{base}/blizzard",
+    )
+    raider = RaiderIoClient(
+        transport.session("raiderio"),
+        region="eu",
+        limiter=unlimited("raiderio"),
+        timeout=transport.timeout,
+        base_url=f"{base}/raiderio",
+    )
+    characters = CharacterService(blizzard, raider)
+    realms = RealmService(blizzard)
+
+    rng = random.Random(args.seed)
+    try:
+        # Warm the token so it doesn't skew the first samples
+        await oauth.get_access_token()
+        await _upstream_calls(control, base, reset=True)
+
+        if scenario == "character":
+            names = [f"char{i}" for i in range(args.characters)]
+
+            async def call(_i: int) -> None:
+                await characters.get_character_overview(realm_slug="realm-1", character_name=rng.choice(names))
+        else:
+
+            async def call(_i: int) -> None:
+                slug = f"realm-{rng.randint(1, args.realms)}"
+                await realms.get_realm_status_text(realm_slug=slug)
+
+        latencies, errors, unexpected, wall = await _drive(args.requests, args.concurrency, call)
+        latencies.sort()
+        calls = await _upstream_calls(control, base)
+        return Report(
+            scenario=scenario,
+            requests=args.requests,
+            concurrency=args.concurrency,
+            errors=errors,
+            unexpected_errors=unexpected,
+            wall_seconds=round(wall, 3),
+            throughput_rps=round(args.requests / wall, 1) if wall else 0.0,
+            p50_ms=round(_percentile(latencies, 50) * 1000, 1),
+            p95_ms=round(_percentile(latencies, 95) * 1000, 1),
+            p99_ms=round(_percentile(latencies, 99) * 1000, 1),
+            max_ms=round(latencies[-1] * 1000, 1) if latencies else 0.0,
+            upstream_calls=calls,
+            upstream_calls_per_command=round(calls / args.requests, 2),
+            peak_rss_mb=round(_peak_rss_mb(), 1),
+        )
+    finally:
+        await characters.close()
+        await transport.close()
+        await control.close()
+
+
+def _print_table(reports: list[Report]) -> None:
+    cols = ["scenario", "requests", "concurrency", "errors", "unexpected_errors", "throughput_rps", "p50_ms", "p95_ms", "p99_ms",
+            "max_ms", "upstream_calls_per_command", "peak_rss_mb"]
+    rows = [[str(getattr(r, c)) for c in cols] for r in reports]
+    widths = [max(len(c), *(len(row[i]) for row in rows)) for i, c in enumerate(cols)]
+    print("  ".join(c.ljust(w) for c, w in zip(cols, widths)))
+    for row in rows:
+        print("  ".join(v.ljust(w) for v, w in zip(row, widths)))
+
+
+def main(argv: list[str] | None = None) -> None:
+    p = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("--scenario", choices=["character", "realm", "both"], default="both")
+    p.add_argument("--requests", type=int, default=300)
+    p.add_argument("--concurrency", type=int, default=30)
+    p.add_argument("--characters", type=int, default=100, help="distinct characters to sample from")
+    p.add_argument("--realms", type=int, default=250)
+    p.add_argument("--latency-ms", type=float, default=80.0)
+    p.add_argument("--jitter-ms", type=float, default=20.0)
+    p.add_argument("--error-rate", type=float, default=0.0)
+    p.add_argument("--payload-kb", type=float, default=0.0)
+    p.add_argument("--pool-size", type=int, default=100, help="connections per upstream host")
+    p.add_argument("--seed", type=int, default=42)
+    p.add_argument("--json", action="store_true", help="print machine-readable JSON")
+    args = p.parse_args(argv)
+
+    reports = run(args)
+    if args.json:
+        print(json.dumps([asdict(r) for r in reports], indent=2))
+    else:
+        _print_table(reports)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,57 +1,192 @@
 from __future__ import annotations
 
-import aiohttp
+import asyncio
+import logging
+import time
+
 import discord
 from discord.ext import commands
 
+from . import metrics
 from .config import Settings, get_settings
 from .clients.blizzard_oauth import BlizzardOAuthClient
-from .clients.blizzard_api import BlizzardApiClient
-from .clients.raiderio_api import RaiderIoClient
-from .services.character_service import CharacterService
-from .services.realm_service import RealmService
+from .clients.transport import HttpTransport, TransportConfig
+from .services.realm_alerts import RealmAlertStore
+from .services.registry import ServiceRegistry
 from .cogs.wow import WowCog
+from .startup import CommandSyncState, StartupTimer, command_tree_fingerprint
+from .utils.cache_backend import TieredCache, create_backend
+from .utils.ratelimit import RateLimiter
+
+log = logging.getLogger(__name__)
 
 
-class GwydeonBot(commands.Bot):
-    def __init__(self, settings: Settings | None = None):
-        super().__init__(command_prefix="!", intents=discord.Intents.default())
-        self.settings = settings or get_settings()
+class GwydeonBot(commands.AutoShardedBot):
+    """The bot, auto-sharded.
 
-        self.http_session: aiohttp.ClientSession | None = None
-        self.character_service: CharacterService | None = None
-        self.realm_service: RealmService | None = None
+    Alone it runs every shard in this process. In cluster mode each worker
+    process runs one group of ``shard_ids`` and takes ``1 / workers`` of the
+    shared API quotas; only worker 0 syncs the command tree, and only when
+    its fingerprint changed since the last sync. Boot phases are timed in
+    ``startup`` and logged once the bot is ready.
+    """
+
+    def __init__(
+        self,
+        settings: Settings | None = None,
+        *,
+        shard_ids: list[int] | None = None,
+        shard_count: int | None = None,
+        worker_id: int = 0,
+        workers: int = 1,
+        startup: StartupTimer | None = None,
+    ):
+        settings = settings or get_settings()
+        super().__init__(
+            command_prefix="!",
+            intents=discord.Intents.default(),
+            shard_ids=shard_ids,
+            shard_count=shard_count or settings.shard_count,
+        )
+        self.settings = settings
+        self.worker_id = worker_id
+        self.workers = workers
+        self.startup = startup or StartupTimer()
+
+        self.transport: HttpTransport | None = None
+        self.oauth: BlizzardOAuthClient | None = None
+        self.cache: TieredCache | None = None
+        self.services: ServiceRegistry | None = None
+        self.metrics_server: metrics.MetricsServer | None = None
+        self._sync_task: asyncio.Task[None] | None = None
+        self._warm_task: asyncio.Task[None] | None = None
 
     async def setup_hook(self):
-        self.http_session = aiohttp.ClientSession()
+        # Connecting, static login and the application info fetch
+        self.startup.mark("login")
+        self.transport = HttpTransport(
+            TransportConfig(
+                limit_per_host=self.settings.http_limit_per_host,
+                dns_cache_ttl=self.settings.http_dns_cache_ttl,
+            )
+        )
+        if self.settings.cache_backend:
+            self.cache = TieredCache(create_backend(self.settings.cache_backend, self.settings.cache_url))
 
         oauth = BlizzardOAuthClient(
-            self.http_session,
+            self.transport.session("oauth"),
             self.settings.blizzard_client_id,
             self.settings.blizzard_client_secret,
         )
-        blizzard = BlizzardApiClient(
-            self.http_session,
-            oauth,
-            region=self.settings.wow_region,
-            locale=self.settings.wow_locale,
-        )
-        raider = RaiderIoClient(self.http_session, region=self.settings.wow_region)
+        oauth.start()
+        self.oauth = oauth
+        self.startup.mark("clients")
 
-        self.character_service = CharacterService(blizzard, raider)
-        self.realm_service = RealmService(blizzard)
+        self.services = ServiceRegistry(
+            transport=self.transport,
+            oauth=oauth,
+            default_region=self.settings.wow_region,
+            default_locale=self.settings.wow_locale,
+            regions=self.settings.wow_regions,
+            blizzard_limiter=RateLimiter.blizzard(
+                max_wait=self.settings.ratelimit_max_wait,
+                share=1 / self.workers,
+            ),
+            raiderio_limiter=RateLimiter.per_minute(
+                "raiderio",
+                self.settings.raiderio_requests_per_minute / self.workers,
+                max_wait=self.settings.ratelimit_max_wait,
+            ),
+            shared_cache=self.cache,
+            not_found_ttl=self.settings.not_found_ttl,
+            not_found_max_entries=self.settings.not_found_max_entries,
+            prefetch_watchlist=self.settings.prefetch_watchlist,
+            prefetch_budget_per_minute=self.settings.prefetch_budget_per_minute / self.workers,
+            prefetch_off_peak_hours=self.settings.prefetch_off_peak_hours,
+            realm_status_poll_seconds=self.settings.realm_status_poll_seconds,
+        )
+        metrics.REGISTRY.register_collector(self.services.collect_metrics)
+        metrics.REGISTRY.register_collector(self.startup.collect_metrics)
+        self.startup.mark("services")
 
-        await self.add_cog(WowCog(self, self.character_service, self.realm_service))
+        alerts = RealmAlertStore(self.settings.realm_alerts_path)
+        await self.add_cog(WowCog(self, self.services, alerts))
+        self.startup.mark("cogs")
+        # Region services, the metrics server and the alert store load while the gateway connects
+        self._warm_task = asyncio.create_task(self._warm_up(alerts), name="warm-up")
 
+        # The tree is global: one worker syncing it is enough
+        if self.worker_id != 0:
+            return
         # Sync rápido en tu servidor (dev)
-        if self.settings.discord_guild_id:
-            guild = discord.Object(id=self.settings.discord_guild_id)
+        guild = discord.Object(id=self.settings.discord_guild_id) if self.settings.discord_guild_id else None
+        if guild is not None:
             self.tree.copy_global_to(guild=guild)
+        # Off the critical path: the gateway connects while this runs
+        self._sync_task = asyncio.create_task(self._sync_commands(guild), name="command-tree-sync")
+
+    async def _warm_up(self, alerts: RealmAlertStore) -> None:
+        start = time.perf_counter()
+        try:
+            # The default region; the others are built on first use
+            self.services.get()  # type: ignore[union-attr]
+            if self.settings.metrics_port:
+                self.metrics_server = metrics.MetricsServer(port=self.settings.metrics_port)
+                await self.metrics_server.start()
+            await alerts.load()
+        except Exception:
+            log.exception("Warm-up failed")
+        self.startup.record("warm_up", time.perf_counter() - start)
+
+    async def _sync_commands(self, guild: discord.Object | None) -> None:
+        try:
+            await self._sync_if_changed(guild)
+        except Exception:
+            # A background task: nobody would see the error otherwise
+            log.exception("Command tree sync failed")
+
+    async def _sync_if_changed(self, guild: discord.Object | None) -> None:
+        payload = [cmd.to_dict(self.tree) for cmd in self.tree.get_commands(guild=guild)]
+        fingerprint = command_tree_fingerprint(payload)
+        scope = f"{self.application_id}:{guild.id if guild else 'global'}"
+        state = CommandSyncState(self.settings.command_sync_state_path)
+        if await asyncio.to_thread(state.get, scope) == fingerprint:
+            log.info("Command tree unchanged (%s), skipping sync", fingerprint[:12])
+            return
+
+        start = time.perf_counter()
+        try:
             await self.tree.sync(guild=guild)
-        else:
-            await self.tree.sync()
+        except discord.HTTPException as e:
+            log.warning("Command tree sync failed: %s", e)
+            return
+        await asyncio.to_thread(state.set, scope, fingerprint)
+        log.info("Synced %d commands in %.2fs (%s)", len(payload), time.perf_counter() - start, fingerprint[:12])
+
+    async def on_ready(self):
+        # Fires again after every reconnect; only the first one ends the boot
+        if self.startup.done:
+            return
+        self.startup.done = True
+        self.startup.mark("gateway")
+        log.info(self.startup.report())
 
     async def close(self):
-        if self.http_session:
-            await self.http_session.close()
+        for task in (self._sync_task, self._warm_task):
+            if task is not None:
+                # Awaited so shutdown doesn't race the state file write
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+        metrics.REGISTRY.unregister_collector(self.startup.collect_metrics)
+        if self.metrics_server:
+            await self.metrics_server.close()
+        if self.services:
+            metrics.REGISTRY.unregister_collector(self.services.collect_metrics)
+            await self.services.close()
+        if self.oauth:
+            await self.oauth.close()
+        if self.cache:
+            await self.cache.close()
+        if self.transport:
+            await self.transport.close()
         await super().close()
@@ -1,24 +1,104 @@
 from __future__ import annotations
 
+import asyncio
 import re
+import time
+from dataclasses import dataclass
 from typing import Any
+from urllib.parse import urlencode
 
 import aiohttp
 
-from ..domain.errors import WowApiError, WowNotFound, WowRateLimited
+from .. import metrics
+from ..domain.errors import WowApiError, WowNotFound, WowRateLimited, WowUnavailable, WowUpstreamError
+from ..utils.cache import CacheStats, TTLCache
+from ..utils.cache_backend import TieredCache
+from ..utils.ratelimit import RateLimiter
+from ..utils.resilience import Resilience, parse_retry_after
+from ..utils.singleflight import SingleFlight, SingleFlightStats
 from .blizzard_oauth import BlizzardOAuthClient
+from .transport import json_loads
+
+
+_Key = tuple[str, tuple[tuple[str, str], ...]]
+
+_MAX_AGE_RE = re.compile(r"max-age=(\d+)")
+
+# Collapse concrete paths into low-cardinality metric labels
+_ENDPOINT_PATTERNS = (
+    (re.compile(r"^/profile/wow/character/[^/]+/[^/]+"), "/profile/wow/character/{realm}/{name}"),
+    (re.compile(r"^/data/wow/guild/[^/]+/[^/]+"), "/data/wow/guild/{realm}/{guild}"),
+    (re.compile(r"/\d+(?=/|$)"), "/{id}"),
+)
+
+
+def endpoint_template(path: str) -> str:
+    for pattern, repl in _ENDPOINT_PATTERNS:
+        path = pattern.sub(repl, path)
+    return path
+
+
+class _Unauthorized(Exception):
+    """Internal signal: the bearer token was rejected (401)."""
+
+
+@dataclass
+class _Validated:
+    """Last good response for a URL, kept for conditional revalidation."""
+
+    data: dict[str, Any]
+    etag: str | None
+    last_modified: str | None
+    fresh_until: float  # time.monotonic(); from Cache-Control max-age
+    size: int
 
 
 class BlizzardApiClient:
-    def __init__(self, session: aiohttp.ClientSession, oauth: BlizzardOAuthClient, *, region: str, locale: str):
+    # Shared-tier TTL (seconds) by namespace family, for endpoints that opt in.
+    # Only static or slow-changing data: an L2 lookup is not worth it on the hot path.
+    PERSIST_TTLS: dict[str, float] = {
+        "static": 7 * 24 * 3600,
+        "dynamic": 24 * 3600,
+    }
+
+    def __init__(
+        self,
+        session: aiohttp.ClientSession,
+        oauth: BlizzardOAuthClient,
+        *,
+        region: str,
+        locale: str,
+        shared_cache: TieredCache | None = None,
+        limiter: RateLimiter | None = None,
+        resilience: Resilience | None = None,
+        timeout: aiohttp.ClientTimeout | None = None,
+        base_url: str | None = None,
+        not_found_ttl: float = 60,
+        not_found_max_entries: int = 10_000,
+    ):
         self._session = session
+        self._base_url = base_url
+        self._timeout = timeout or aiohttp.ClientTimeout(total=20)
         self._oauth = oauth
         self.region = region.lower()
         self.locale = locale
+        self._shared = shared_cache
+        self.limiter = limiter or RateLimiter.blizzard()
+        self.resilience = resilience or Resilience("blizzard")
+        self._inflight: SingleFlight[_Key, dict[str, Any]] = SingleFlight()
+        # Validators + decoded bodies per URL; bounded by the raw body size
+        self._validated: TTLCache[_Key, _Validated] = TTLCache(
+            6 * 3600,
+            max_entries=5_000,
+            max_bytes=64 * 1024 * 1024,
+            sizeof=lambda v: v.size,
+        )
+        # Recent 404s (misspelled/transferred characters, unknown guilds): key -> message
+        self._not_found: TTLCache[_Key, str] = TTLCache(not_found_ttl, max_entries=not_found_max_entries)
 
     @property
     def base_url(self) -> str:
-        return f"https://{self.region}.api.blizzard.com"
+        return self._base_url or f"https://{self.region}.api.blizzard.com"
 
     def _ns_profile(self) -> str:
         return f"profile-{self.region}"
@@ -29,29 +109,180 @@ class BlizzardApiClient:
     def _ns_static(self) -> str:
         return f"static-{self.region}"
 
-    async def _get(self, path: str, params: dict[str, str]) -> dict[str, Any]:
+    @staticmethod
+    def _family(params: dict[str, str]) -> str:
+        # "profile-eu" -> "profile"; breakers and shared-tier TTLs work per family
+        return params.get("namespace", "").split("-", 1)[0] or "default"
+
+    @property
+    def coalesce_stats(self) -> SingleFlightStats:
+        return self._inflight.stats
+
+    def cache_stats(self) -> dict[str, CacheStats]:
+        return {"http_validators": self._validated.stats, "blizzard_not_found": self._not_found.stats}
+
+    async def _get(self, path: str, params: dict[str, str], *, persist: bool = False) -> dict[str, Any]:
+        key = (path, tuple(sorted(params.items())))
+        not_found = self._not_found.get(key)
+        if not_found is not None:
+            raise WowNotFound(not_found)
+        try:
+            # Identical concurrent GETs share one upstream call and decoded result
+            if persist and self._shared is not None:
+                return await self._inflight.do(key, lambda: self._fetch_persisted(key, path, params))
+            return await self._inflight.do(key, lambda: self._fetch(key, path, params))
+        except WowNotFound as e:
+            self._not_found.set(key, str(e))
+            raise
+
+    async def _fetch_persisted(self, key: _Key, path: str, params: dict[str, str]) -> dict[str, Any]:
+        assert self._shared is not None
+        ttl = self.PERSIST_TTLS.get(self._family(params), 0)
+        if not ttl:
+            return await self._fetch(key, path, params)
+
+        shared_key = f"{self.base_url}{path}?{urlencode(sorted(params.items()))}"
+        cached = await self._shared.get(shared_key)
+        if cached is not None:
+            return cached
+
+        data = await self._fetch(key, path, params)
+        self._shared.set(shared_key, data, ttl)
+        return data
+
+    async def _fetch(self, key: _Key, path: str, params: dict[str, str]) -> dict[str, Any]:
+        prev = self._validated.get(key)
+        if prev is not None and time.monotonic() < prev.fresh_until:
+            # Still fresh per Cache-Control: no round-trip at all
+            return prev.data
+
+        try:
+            return await self.resilience.call(
+                self._family(params),
+                lambda: self._fetch_authorized(key, path, params, prev),
+            )
+        except (WowUpstreamError, WowUnavailable):
+            if prev is None:
+                raise
+            # Upstream is struggling: a stale copy beats an error
+            return prev.data
+
+    async def _fetch_authorized(
+        self,
+        key: _Key,
+        path: str,
+        params: dict[str, str],
+        prev: _Validated | None,
+    ) -> dict[str, Any]:
         token = await self._oauth.get_access_token()
+        try:
+            return await self._get_with_token(key, path, params, token, prev)
+        except _Unauthorized:
+            # Token revoked or expired server-side: re-auth and retry once
+            self._oauth.invalidate(token)
+            token = await self._oauth.get_access_token()
+            try:
+                return await self._get_with_token(key, path, params, token, prev)
+            except _Unauthorized as e:
+                raise WowApiError("Blizzard API 401") from e
+
+    async def _get_with_token(
+        self,
+        key: _Key,
+        path: str,
+        params: dict[str, str],
+        token: str,
+        prev: _Validated | None,
+    ) -> dict[str, Any]:
+        # The slot is held for the whole request: per-priority caps bound in-flight calls
+        async with self.limiter.slot():
+            return await self._request(key, path, params, token, prev)
+
+    async def _request(
+        self,
+        key: _Key,
+        path: str,
+        params: dict[str, str],
+        token: str,
+        prev: _Validated | None,
+    ) -> dict[str, Any]:
         headers = {"Authorization": f"Bearer {token}"}
+        if prev is not None:
+            if prev.etag:
+                headers["If-None-Match"] = prev.etag
+            if prev.last_modified:
+                headers["If-Modified-Since"] = prev.last_modified
         url = self.base_url + path
 
+        status = "error"
+        start = time.perf_counter()
         try:
             async with self._session.get(
                 url,
                 headers=headers,
                 params=params,
-                timeout=aiohttp.ClientTimeout(total=20),
+                timeout=self._timeout,
             ) as resp:
+                status = str(resp.status)
+                if resp.status == 304 and prev is not None:
+                    prev.fresh_until = self._fresh_until(resp.headers)
+                    return prev.data
+                if resp.status == 401:
+                    raise _Unauthorized()
                 if resp.status == 404:
                     raise WowNotFound("No encontrado")
                 if resp.status == 429:
-                    raise WowRateLimited("Rate limited (Blizzard)")
+                    raise WowRateLimited(
+                        "Rate limited (Blizzard)",
+                        retry_after=parse_retry_after(resp.headers.get("Retry-After")),
+                    )
                 if resp.status >= 500:
-                    raise WowApiError(f"Blizzard API {resp.status}")
+                    raise WowUpstreamError(f"Blizzard API {resp.status}")
                 if resp.status != 200:
                     raise WowApiError(f"Error {resp.status}: {await resp.text()}")
-                return await resp.json()
+                body = await resp.read()
+                try:
+                    data = json_loads(body)
+                except ValueError as e:
+                    raise WowUpstreamError(f"Invalid JSON (Blizzard): {e}") from e
+                if not isinstance(data, dict):
+                    raise WowUpstreamError(f"Unexpected JSON (Blizzard): {type(data).__name__}")
+                self._remember(key, data, resp.headers, len(body))
+                return data
         except aiohttp.ClientError as e:
-            raise WowApiError(f"Network error (Blizzard): {e}") from e
+            raise WowUpstreamError(f"Network error (Blizzard): {e}") from e
+        except asyncio.TimeoutError as e:
+            status = "timeout"
+            raise WowUpstreamError("Timeout (Blizzard)") from e
+        finally:
+            metrics.UPSTREAM_LATENCY.observe(
+                time.perf_counter() - start, "blizzard", "GET", endpoint_template(path), status
+            )
+
+    def _remember(self, key: _Key, data: dict[str, Any], headers: Any, size: int) -> None:
+        cache_control = headers.get("Cache-Control", "")
+        etag = headers.get("ETag")
+        last_modified = headers.get("Last-Modified")
+        if "no-store" in cache_control or not (etag or last_modified or "max-age" in cache_control):
+            return
+        self._validated.set(
+            key,
+            _Validated(
+                data=data,
+                etag=etag,
+                last_modified=last_modified,
+                fresh_until=self._fresh_until(headers),
+                size=size,
+            ),
+        )
+
+    @staticmethod
+    def _fresh_until(headers: Any) -> float:
+        cache_control = headers.get("Cache-Control", "")
+        m = _MAX_AGE_RE.search(cache_control)
+        if not m or "no-cache" in cache_control:
+            return 0.0
+        return time.monotonic() + int(m.group(1))
 
     # -----------------------------
     # Character Profile APIs
@@ -80,6 +311,15 @@ class BlizzardApiClient:
             {"namespace": self._ns_profile(), "locale": self.locale},
         )
 
+    # -----------------------------
+    # Guild APIs
+    # -----------------------------
+    async def guild_roster(self, realm_slug: str, guild_slug: str) -> dict[str, Any]:
+        return await self._get(
+            f"/data/wow/guild/{realm_slug}/{guild_slug}/roster",
+            {"namespace": self._ns_profile(), "locale": self.locale},
+        )
+
     # -----------------------------
     # Game Data APIs (Achievement)
     # -----------------------------
@@ -87,6 +327,7 @@ class BlizzardApiClient:
         return await self._get(
             f"/data/wow/achievement/{achievement_id}",
             {"namespace": self._ns_static(), "locale": self.locale},
+            persist=True,
         )
 
     # -----------------------------
@@ -96,12 +337,14 @@ class BlizzardApiClient:
         return await self._get(
             "/data/wow/realm/index",
             {"namespace": self._ns_dynamic(), "locale": self.locale},
+            persist=True,
         )
 
     async def realm_by_id(self, realm_id: int) -> dict[str, Any]:
         return await self._get(
             f"/data/wow/realm/{realm_id}",
             {"namespace": self._ns_dynamic(), "locale": self.locale},
+            persist=True,
         )
 
     @staticmethod
@@ -115,6 +358,19 @@ class BlizzardApiClient:
             {"namespace": self._ns_dynamic(), "locale": self.locale},
         )
 
+    async def connected_realm_search(self, page: int = 1, page_size: int = 1000) -> dict[str, Any]:
+        """One page of every connected realm in the region, status included."""
+        return await self._get(
+            "/data/wow/search/connected-realm",
+            {
+                "namespace": self._ns_dynamic(),
+                "locale": self.locale,
+                "orderby": "id",
+                "_page": str(page),
+                "_pageSize": str(page_size),
+            },
+        )
+
     # -----------------------------
     # Armory URL
     # -----------------------------
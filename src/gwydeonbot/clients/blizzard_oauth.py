@@ -1,52 +1,160 @@
 from __future__ import annotations
 
+import asyncio
+import logging
 import time
 from dataclasses import dataclass
 
 import aiohttp
 
-from ..domain.errors import WowApiError, WowRateLimited
+from .. import metrics
+from ..domain.errors import WowApiError, WowRateLimited, WowUpstreamError
+from .transport import json_loads
+
+log = logging.getLogger(__name__)
 
 
 @dataclass
 class OAuthToken:
     access_token: str
-    expires_at: float
+    expires_at: float  # time.monotonic() deadline
 
 
 class BlizzardOAuthClient:
-    """Client-credentials OAuth for Battle.net."""
+    """Client-credentials OAuth for Battle.net.
+
+    Refreshes are single-flight: concurrent callers share one POST to the token
+    endpoint. ``start()`` launches a background task that renews the token
+    ahead of expiry so interactive requests never wait for it.
+    """
 
     TOKEN_URL = "https://oauth.battle.net/token"
 
-    def __init__(self, session: aiohttp.ClientSession, client_id: str, client_secret: str):
+    # Refresh a bit early
+    EARLY_REFRESH_SECONDS = 30
+    # Background renewal margin before expires_at
+    RENEW_AHEAD_SECONDS = 300
+    RENEW_RETRY_SECONDS = 15
+    # Floor for expires_in: a missing or bogus value must not turn renewal into a busy loop
+    MIN_TOKEN_LIFETIME_SECONDS = 120
+
+    def __init__(
+        self,
+        session: aiohttp.ClientSession,
+        client_id: str,
+        client_secret: str,
+        *,
+        timeout: aiohttp.ClientTimeout | None = None,
+        token_url: str | None = None,
+    ):
         self._session = session
+        self._token_url = token_url or self.TOKEN_URL
+        self._timeout = timeout or aiohttp.ClientTimeout(total=15)
         self._client_id = client_id
         self._client_secret = client_secret
         self._token: OAuthToken | None = None
+        self._lock = asyncio.Lock()
+        self._renew_task: asyncio.Task[None] | None = None
+
+    def _is_fresh(self, token: OAuthToken | None) -> bool:
+        return token is not None and time.monotonic() < token.expires_at - self.EARLY_REFRESH_SECONDS
 
     async def get_access_token(self) -> str:
-        # Refresh a bit early
-        if self._token and time.time() < self._token.expires_at - 30:
-            return self._token.access_token
+        token = self._token
+        if self._is_fresh(token):
+            return token.access_token  # type: ignore[union-attr]
+
+        async with self._lock:
+            # Another waiter may have refreshed while we were queued
+            if self._is_fresh(self._token):
+                return self._token.access_token  # type: ignore[union-attr]
+            return (await self._refresh()).access_token
+
+    def invalidate(self, access_token: str) -> None:
+        """Drop ``access_token`` if it is still current (e.g. after a 401)."""
+        if self._token and self._token.access_token == access_token:
+            self._token = None
+
+    async def _refresh(self) -> OAuthToken:
+        try:
+            token = await self._request_token()
+        except WowApiError:
+            metrics.OAUTH_REFRESHES.inc("error")
+            raise
+        metrics.OAUTH_REFRESHES.inc("ok")
+        return token
 
+    async def _request_token(self) -> OAuthToken:
         try:
             async with self._session.post(
-                self.TOKEN_URL,
+                self._token_url,
                 data={"grant_type": "client_credentials"},
                 auth=aiohttp.BasicAuth(self._client_id, self._client_secret),
-                timeout=aiohttp.ClientTimeout(total=15),
+                timeout=self._timeout,
             ) as resp:
                 if resp.status == 429:
                     raise WowRateLimited("Rate limited (OAuth)")
+                if resp.status >= 500:
+                    raise WowUpstreamError(f"OAuth error {resp.status}")
                 if resp.status != 200:
                     raise WowApiError(f"OAuth error {resp.status}: {await resp.text()}")
-                data = await resp.json()
+                body = await resp.read()
+            data = json_loads(body)
+        except ValueError as e:
+            raise WowUpstreamError(f"OAuth invalid JSON: {e}") from e
         except aiohttp.ClientError as e:
-            raise WowApiError(f"OAuth network error: {e}") from e
+            raise WowUpstreamError(f"OAuth network error: {e}") from e
+        except asyncio.TimeoutError as e:
+            raise WowUpstreamError("OAuth timeout") from e
+
+        try:
+            access_token = data["access_token"]
+            expires_in = float(data.get("expires_in") or 0)
+        except (TypeError, KeyError, ValueError, AttributeError) as e:
+            raise WowUpstreamError(f"OAuth malformed token response: {e!r}") from e
+        if not isinstance(access_token, str) or not access_token:
+            raise WowUpstreamError("OAuth malformed token response: no access_token")
 
         self._token = OAuthToken(
-            access_token=data["access_token"],
-            expires_at=time.time() + float(data.get("expires_in", 0)),
+            access_token=access_token,
+            expires_at=time.monotonic() + max(expires_in, self.MIN_TOKEN_LIFETIME_SECONDS),
         )
-        return self._token.access_token
+        return self._token
+
+    # -----------------------------
+    # Background renewal
+    # -----------------------------
+    def start(self) -> None:
+        if self._renew_task is None or self._renew_task.done():
+            self._renew_task = asyncio.create_task(self._renew_loop(), name="blizzard-oauth-renew")
+
+    async def close(self) -> None:
+        if self._renew_task:
+            self._renew_task.cancel()
+            try:
+                await self._renew_task
+            except asyncio.CancelledError:
+                pass
+            self._renew_task = None
+
+    async def _renew_loop(self) -> None:
+        while True:
+            token = self._token
+            if token is not None:
+                remaining = token.expires_at - time.monotonic()
+                # Short-lived tokens renew at half-life instead
+                delay = remaining - min(self.RENEW_AHEAD_SECONDS, remaining / 2)
+                await asyncio.sleep(max(delay, 1.0))
+
+            try:
+                async with self._lock:
+                    # Skip if a caller already refreshed while we slept
+                    if self._token is token or not self._is_fresh(self._token):
+                        await self._refresh()
+            except WowApiError as e:
+                log.warning("OAuth background renewal failed: %s", e)
+                await asyncio.sleep(self.RENEW_RETRY_SECONDS)
+            except Exception:
+                # Keep renewing: otherwise every command pays for a synchronous refresh
+                log.exception("OAuth background renewal failed")
+                await asyncio.sleep(self.RENEW_RETRY_SECONDS)
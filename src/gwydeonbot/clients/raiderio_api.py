@@ -1,23 +1,79 @@
 from __future__ import annotations
 
+import asyncio
+import time
 from typing import Any
 
 import aiohttp
 
-from ..domain.errors import WowApiError, WowNotFound, WowRateLimited
+from .. import metrics
+from ..domain.errors import WowApiError, WowNotFound, WowRateLimited, WowUpstreamError
+from ..utils.cache import CacheStats, TTLCache
+from ..utils.ratelimit import RateLimiter
+from ..utils.resilience import Resilience, RetryPolicy, parse_retry_after
+from ..utils.singleflight import SingleFlight, SingleFlightStats
+from .transport import json_loads
+
+_Key = tuple[str, tuple[tuple[str, str], ...]]
 
 
 class RaiderIoClient:
     BASE_URL = "https://raider.io/api/v1"
 
-    def __init__(self, session: aiohttp.ClientSession, *, region: str):
+    def __init__(
+        self,
+        session: aiohttp.ClientSession,
+        *,
+        region: str,
+        limiter: RateLimiter | None = None,
+        resilience: Resilience | None = None,
+        timeout: aiohttp.ClientTimeout | None = None,
+        base_url: str | None = None,
+        not_found_ttl: float = 60,
+        not_found_max_entries: int = 10_000,
+    ):
         self._session = session
+        self._base_url = base_url or self.BASE_URL
+        self._timeout = timeout or aiohttp.ClientTimeout(total=20)
         self.region = region.lower()
+        self.limiter = limiter or RateLimiter.per_minute("raiderio", 200)
+        # Raider.IO is optional data: give up sooner than on Blizzard
+        self.resilience = resilience or Resilience("raiderio", RetryPolicy(attempts=2), failure_threshold=3)
+        self._inflight: SingleFlight[_Key, dict[str, Any]] = SingleFlight()
+        # Characters Raider.IO doesn't track: key -> message
+        self._not_found: TTLCache[_Key, str] = TTLCache(not_found_ttl, max_entries=not_found_max_entries)
+
+    @property
+    def coalesce_stats(self) -> SingleFlightStats:
+        return self._inflight.stats
+
+    def cache_stats(self) -> dict[str, CacheStats]:
+        return {"raiderio_not_found": self._not_found.stats}
 
     async def _get(self, path: str, params: dict[str, str]) -> dict[str, Any]:
-        url = self.BASE_URL + path
+        key = (path, tuple(sorted(params.items())))
+        not_found = self._not_found.get(key)
+        if not_found is not None:
+            raise WowNotFound(not_found)
+        try:
+            # Identical concurrent GETs share one upstream call and decoded result
+            return await self._inflight.do(key, lambda: self.resilience.call(path, lambda: self._fetch(path, params)))
+        except WowNotFound as e:
+            self._not_found.set(key, str(e))
+            raise
+
+    async def _fetch(self, path: str, params: dict[str, str]) -> dict[str, Any]:
+        # The slot is held for the whole request: per-priority caps bound in-flight calls
+        async with self.limiter.slot():
+            return await self._request(path, params)
+
+    async def _request(self, path: str, params: dict[str, str]) -> dict[str, Any]:
+        url = self._base_url + path
+        status = "error"
+        start = time.perf_counter()
         try:
-            async with self._session.get(url, params=params, timeout=aiohttp.ClientTimeout(total=20)) as resp:
+            async with self._session.get(url, params=params, timeout=self._timeout) as resp:
+                status = str(resp.status)
                 if resp.status == 404:
                     raise WowNotFound("No encontrado (Raider.IO)")
                 if resp.status == 429:
@@ -25,14 +81,25 @@ class RaiderIoClient:
                     msg = "Rate limited (Raider.IO)"
                     if ra:
                         msg += f" retry-after={ra}"
-                    raise WowRateLimited(msg)
+                    raise WowRateLimited(msg, retry_after=parse_retry_after(ra))
                 if resp.status >= 500:
-                    raise WowApiError(f"Raider.IO {resp.status}")
+                    raise WowUpstreamError(f"Raider.IO {resp.status}")
                 if resp.status != 200:
                     raise WowApiError(f"Raider.IO error {resp.status}: {await resp.text()}")
-                return await resp.json()
+                try:
+                    data = json_loads(await resp.read())
+                except ValueError as e:
+                    raise WowUpstreamError(f"Invalid JSON (Raider.IO): {e}") from e
+                if not isinstance(data, dict):
+                    raise WowUpstreamError(f"Unexpected JSON (Raider.IO): {type(data).__name__}")
+                return data
         except aiohttp.ClientError as e:
-            raise WowApiError(f"Network error (Raider.IO): {e}") from e
+            raise WowUpstreamError(f"Network error (Raider.IO): {e}") from e
+        except asyncio.TimeoutError as e:
+            status = "timeout"
+            raise WowUpstreamError("Timeout (Raider.IO)") from e
+        finally:
+            metrics.UPSTREAM_LATENCY.observe(time.perf_counter() - start, "raiderio", "GET", path, status)
 
     async def character_profile(self, realm_slug: str, character_name: str, fields: list[str] | None = None) -> dict[str, Any]:
         fields_str = ",".join(fields) if fields else ",".join([
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+from typing import Any
+
+import aiohttp
+
+try:  # optional: pip install gwydeonbot[speed]
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None  # type: ignore[assignment]
+
+
+def json_loads(body: bytes) -> Any:
+    """Decode a JSON body, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(body)
+    return json.loads(body)
+
+
+@dataclass(frozen=True)
+class TransportConfig:
+    limit: int = 100
+    limit_per_host: int = 20
+    keepalive_timeout: float = 30.0
+    dns_cache_ttl: int = 300
+    total_timeout: float = 20.0
+    connect_timeout: float = 5.0
+
+    @property
+    def timeout(self) -> aiohttp.ClientTimeout:
+        return aiohttp.ClientTimeout(total=self.total_timeout, connect=self.connect_timeout)
+
+
+class HttpTransport:
+    """One tuned ``aiohttp`` session (and connection pool) per upstream.
+
+    Keeping Blizzard, OAuth and Raider.IO in separate pools means a slow
+    upstream can't hold connections the others need.
+    """
+
+    UPSTREAMS = ("blizzard", "oauth", "raiderio")
+
+    def __init__(self, config: TransportConfig | None = None):
+        self.config = config or TransportConfig()
+        self.timeout = self.config.timeout
+        self._sessions: dict[str, aiohttp.ClientSession] = {}
+
+    def session(self, upstream: str) -> aiohttp.ClientSession:
+        if upstream not in self.UPSTREAMS:
+            raise ValueError(f"Unknown upstream: {upstream}")
+        s = self._sessions.get(upstream)
+        if s is None or s.closed:
+            cfg = self.config
+            connector = aiohttp.TCPConnector(
+                limit=cfg.limit,
+                limit_per_host=cfg.limit_per_host,
+                keepalive_timeout=cfg.keepalive_timeout,
+                ttl_dns_cache=cfg.dns_cache_ttl,
+            )
+            s = self._sessions[upstream] = aiohttp.ClientSession(
+                connector=connector,
+                timeout=self.timeout,
+                raise_for_status=False,
+            )
+        return s
+
+    async def close(self) -> None:
+        for s in self._sessions.values():
+            await s.close()
+        self._sessions.clear()
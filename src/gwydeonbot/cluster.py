@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import multiprocessing as mp
+import os
+import signal
+import time
+from dataclasses import dataclass, replace
+from multiprocessing.process import BaseProcess
+
+from .config import Settings, get_settings
+from .startup import StartupTimer
+
+log = logging.getLogger(__name__)
+
+GATEWAY_BOT_URL = "https://discord.com/api/v10/gateway/bot"
+
+# Restart backoff for crashed workers; reset once a worker stays up this long
+RESTART_BASE_DELAY = 2.0
+RESTART_MAX_DELAY = 60.0
+HEALTHY_AFTER = 300.0
+
+
+@dataclass(frozen=True)
+class WorkerSpec:
+    worker_id: int
+    shard_ids: tuple[int, ...]
+    shard_count: int
+    cpu: int | None  # core to pin the process to
+
+
+def plan_workers(shard_count: int, workers: int, *, pin_cpus: bool = True) -> list[WorkerSpec]:
+    """Split shards into contiguous groups, one per worker process."""
+    workers = max(1, min(workers, shard_count))
+    cpus = sorted(os.sched_getaffinity(0)) if pin_cpus and hasattr(os, "sched_getaffinity") else []
+    base, extra = divmod(shard_count, workers)
+    specs: list[WorkerSpec] = []
+    start = 0
+    for i in range(workers):
+        n = base + (1 if i < extra else 0)
+        specs.append(
+            WorkerSpec(
+                worker_id=i,
+                shard_ids=tuple(range(start, start + n)),
+                shard_count=shard_count,
+                cpu=cpus[i % len(cpus)] if cpus else None,
+            )
+        )
+        start += n
+    return specs
+
+
+async def recommended_shard_count(token: str) -> int:
+    """Shard count Discord recommends for this bot (``GET /gateway/bot``)."""
+    import aiohttp
+
+    headers = {"Authorization": f"Bot {token}"}
+    try:
+        async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=10)) as session:
+            async with session.get(GATEWAY_BOT_URL, headers=headers) as resp:
+                resp.raise_for_status()
+                data = await resp.json()
+        return max(1, int(data.get("shards") or 1))
+    except (aiohttp.ClientError, asyncio.TimeoutError, ValueError, TypeError, AttributeError) as e:
+        # 401 (bad token), network down, odd body: say what to do, not a raw traceback
+        raise RuntimeError(
+            f"No se pudo obtener el número de shards de Discord ({e}). "
+            "Revisa DISCORD_TOKEN o fija SHARD_COUNT."
+        ) from None
+
+
+def _run_worker(spec: WorkerSpec, workers: int) -> None:
+    # Entry point of each worker process (spawned: settings are re-read from env)
+    startup = StartupTimer()
+    from .bot import GwydeonBot
+    from .logging import configure_logging
+
+    startup.mark("imports")
+
+    configure_logging()
+    if spec.cpu is not None and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, {spec.cpu})
+
+    settings = get_settings()
+    if settings.metrics_port:
+        # One scrape target per worker
+        settings = replace(settings, metrics_port=settings.metrics_port + spec.worker_id)
+
+    log.info(
+        "Worker %d: shards %s of %d on cpu %s",
+        spec.worker_id,
+        list(spec.shard_ids),
+        spec.shard_count,
+        spec.cpu if spec.cpu is not None else "any",
+    )
+    bot = GwydeonBot(
+        settings,
+        shard_ids=list(spec.shard_ids),
+        shard_count=spec.shard_count,
+        worker_id=spec.worker_id,
+        workers=workers,
+        startup=startup,
+    )
+    bot.run(settings.discord_token, log_handler=None)
+
+
+class Supervisor:
+    """Run shard groups in worker processes and restart the ones that die.
+
+    Workers are spawned (not forked) so each gets a clean interpreter and
+    event loop. A crashed worker is restarted with exponential backoff; a
+    clean exit (code 0) is not restarted. SIGINT/SIGTERM stop every worker,
+    and workers still alive after 15s are killed.
+    """
+
+    def __init__(self, settings: Settings | None = None):
+        self.settings = settings or get_settings()
+        self._ctx = mp.get_context("spawn")
+        self._procs: dict[int, BaseProcess] = {}
+        self._started_at: dict[int, float] = {}
+        self._failures: dict[int, int] = {}
+        self._restart_at: dict[int, float] = {}
+        self._stopping = False
+
+    def run(self) -> None:
+        shard_count = self.settings.shard_count or asyncio.run(recommended_shard_count(self.settings.discord_token))
+        specs = plan_workers(shard_count, self.settings.cluster_workers, pin_cpus=self.settings.cluster_cpu_affinity)
+        log.info("Cluster: %d shards over %d workers", shard_count, len(specs))
+
+        signal.signal(signal.SIGTERM, self._on_signal)
+        signal.signal(signal.SIGINT, self._on_signal)
+        for spec in specs:
+            self._start(spec, len(specs))
+        try:
+            while not self._stopping:
+                self._check(specs)
+                time.sleep(1.0)
+        finally:
+            self._stop_all()
+
+    def _on_signal(self, signum: int, _frame: object) -> None:
+        log.info("Cluster: received signal %d, stopping workers", signum)
+        self._stopping = True
+
+    def _start(self, spec: WorkerSpec, workers: int) -> None:
+        proc = self._ctx.Process(
+            target=_run_worker,
+            args=(spec, workers),
+            name=f"gwydeonbot-worker-{spec.worker_id}",
+        )
+        proc.start()
+        self._procs[spec.worker_id] = proc
+        self._started_at[spec.worker_id] = time.monotonic()
+
+    def _check(self, specs: list[WorkerSpec]) -> None:
+        now = time.monotonic()
+        for spec in specs:
+            wid = spec.worker_id
+            proc = self._procs.get(wid)
+            if proc is not None and proc.is_alive():
+                if now - self._started_at[wid] > HEALTHY_AFTER:
+                    self._failures[wid] = 0
+                continue
+
+            if proc is not None:
+                # Just died: decide whether and when to restart it
+                del self._procs[wid]
+                if proc.exitcode == 0:
+                    log.info("Cluster: worker %d exited cleanly", wid)
+                    continue
+                failures = self._failures.get(wid, 0) + 1
+                self._failures[wid] = failures
+                delay = min(RESTART_MAX_DELAY, RESTART_BASE_DELAY * 2 ** (failures - 1))
+                self._restart_at[wid] = now + delay
+                log.warning("Cluster: worker %d died (exit %s), restarting in %.1fs", wid, proc.exitcode, delay)
+
+            restart_at = self._restart_at.pop(wid, None)
+            if restart_at is None:
+                continue
+            if now < restart_at:
+                self._restart_at[wid] = restart_at
+                continue
+            self._start(spec, len(specs))
+
+        if not self._procs and not self._restart_at:
+            self._stopping = True
+
+    def _stop_all(self) -> None:
+        # SIGINT lets bot.run() close the gateway and our clients cleanly
+        for proc in self._procs.values():
+            if proc.is_alive() and proc.pid is not None:
+                os.kill(proc.pid, signal.SIGINT)
+        deadline = time.monotonic() + 15
+        for proc in self._procs.values():
+            proc.join(timeout=max(0.0, deadline - time.monotonic()))
+            if proc.is_alive():
+                proc.kill()
+        self._procs.clear()
@@ -1,93 +1,367 @@
 from __future__ import annotations
 
+import logging
+import time
+from typing import Literal
+
 import discord
 from discord import app_commands
 from discord.ext import commands
 
+from .. import metrics
 from ..domain.errors import WowApiError, WowNotFound
-from ..services.character_service import CharacterService
-from ..services.realm_service import RealmService
+from ..domain.models import CharacterOverview, GuildRoster
+from ..services.guild_service import MemberResult
+from ..services.realm_alerts import RealmAlert, RealmAlertStore
+from ..services.realm_status import RealmStatusChange
+from ..services.registry import RegionServices, ServiceRegistry
 from ..utils.discord_helpers import class_color
-from ..utils.text import normalize_character_name, normalize_realm_slug
+from ..utils.text import format_age, normalize_character_name, normalize_guild_slug, normalize_realm_slug
+
+# Minimum seconds between progressive edits of the /hermandad message
+GUILD_EDIT_INTERVAL = 2.0
+GUILD_MAX_LINES = 25
+
+log = logging.getLogger(__name__)
+
+Region = Literal["eu", "us", "kr", "tw"]
 
 
 class WowCog(commands.Cog):
-    def __init__(self, bot: commands.Bot, character_service: CharacterService, realm_service: RealmService):
+    alertas = app_commands.Group(
+        name="alertas",
+        description="Avisos en un canal cuando un reino cae o vuelve.",
+        guild_only=True,
+        default_permissions=discord.Permissions(manage_guild=True),
+    )
+
+    def __init__(self, bot: commands.Bot, services: ServiceRegistry, alerts: RealmAlertStore):
         self.bot = bot
-        self._characters = character_service
-        self._realms = realm_service
+        self._services = services
+        self._alerts = alerts
+        services.add_realm_status_listener(self._on_realm_status_change)
+
+    @commands.Cog.listener()
+    async def on_app_command_completion(
+        self,
+        interaction: discord.Interaction,
+        command: app_commands.Command | app_commands.ContextMenu,
+    ):
+        # Measured from Discord's interaction timestamp: includes gateway delivery
+        elapsed = (discord.utils.utcnow() - interaction.created_at).total_seconds()
+        metrics.COMMAND_LATENCY.observe(elapsed, command.qualified_name)
+
+    async def _region_services(self, interaction: discord.Interaction, region: str | None) -> RegionServices | None:
+        try:
+            return self._services.get(region)
+        except ValueError:
+            await interaction.followup.send(f"La región **{region}** no está habilitada.", ephemeral=True)
+            return None
+
+    async def _realm_slug(self, interaction: discord.Interaction, svc: RegionServices, reino: str) -> str | None:
+        """Canonical slug for ``reino``, checked against the in-memory realm index.
+
+        Unknown realms are answered right here (with suggestions) instead of
+        costing an upstream 404. Before the index has loaded the input is
+        passed through as typed.
+        """
+        directory = svc.realms.directory
+        if not directory.loaded:
+            return normalize_realm_slug(reino)
+        entry = directory.lookup(reino)
+        if entry:
+            return entry.slug
+
+        text = f"No encuentro el reino **{reino}** en {svc.region.upper()}."
+        suggestions = directory.suggest(reino, limit=3)
+        if suggestions:
+            text += " ¿Quizás " + ", ".join(f"**{e.name}**" for e in suggestions) + "?"
+        await interaction.followup.send(text, ephemeral=True)
+        return None
 
     @app_commands.command(
         name="personaje",
         description="Nivel, clase, raza, spec, hermandad, ilvl, M+ y progreso de raid.",
     )
-    async def personaje(self, interaction: discord.Interaction, nombre: str, reino: str):
+    @app_commands.describe(region="Región (por defecto la del bot)")
+    async def personaje(
+        self,
+        interaction: discord.Interaction,
+        nombre: str,
+        reino: str,
+        region: Region | None = None,
+    ):
         await interaction.response.defer(thinking=True)
+        svc = await self._region_services(interaction, region)
+        if svc is None:
+            return
 
-        realm_slug = normalize_realm_slug(reino)
+        realm_slug = await self._realm_slug(interaction, svc, reino)
+        if realm_slug is None:
+            return
         char_name = normalize_character_name(nombre)
 
         try:
-            ov = await self._characters.get_character_overview(realm_slug=realm_slug, character_name=char_name)
+            ov, pending = await svc.characters.get_character_overview_progressive(
+                realm_slug=realm_slug,
+                character_name=char_name,
+            )
+            message = await interaction.followup.send(
+                embed=self._character_embed(ov, reino, raiderio_pending=pending is not None),
+                wait=True,
+            )
+            if pending is not None:
+                # Raider.IO is usually the slowest upstream: patch its fields in later
+                ov = await pending
+                await self._try_edit(message, self._character_embed(ov, reino))
+        except WowNotFound:
+            await interaction.followup.send(
+                f"No encuentro **{nombre}** en **{reino}** ({svc.region.upper()}).",
+                ephemeral=True,
+            )
+        except WowApiError as e:
+            await interaction.followup.send(
+                f"API respondió con error.\n`{e}`",
+                ephemeral=True,
+            )
 
-            desc_lines = [f"**Facción:** {ov.faction}"]
-            if ov.guild:
-                desc_lines.append(f"**Hermandad:** {ov.guild}")
-            desc_lines.append(f"🔗 [Ver en la Armory]({ov.armory_url})")
+    @staticmethod
+    def _character_embed(ov: CharacterOverview, reino: str, *, raiderio_pending: bool = False) -> discord.Embed:
+        desc_lines = [f"**Facción:** {ov.faction}"]
+        if ov.guild:
+            desc_lines.append(f"**Hermandad:** {ov.guild}")
+        desc_lines.append(f"🔗 [Ver en la Armory]({ov.armory_url})")
 
-            embed = discord.Embed(
-                title=f"{ov.name} - {reino} ({ov.region.upper()})",
-                description="\n".join(desc_lines),
-                color=class_color(ov.class_id),
-            )
+        embed = discord.Embed(
+            title=f"{ov.name} - {reino} ({ov.region.upper()})",
+            description="\n".join(desc_lines),
+            color=class_color(ov.class_id),
+        )
 
-            embed.add_field(name="Nivel", value=ov.level, inline=True)
-            embed.add_field(name="Clase", value=ov.class_name, inline=True)
-            embed.add_field(name="Raza", value=ov.race, inline=True)
-            if ov.spec:
-                embed.add_field(name="Spec", value=ov.spec, inline=True)
+        embed.add_field(name="Nivel", value=ov.level, inline=True)
+        embed.add_field(name="Clase", value=ov.class_name, inline=True)
+        embed.add_field(name="Raza", value=ov.race, inline=True)
+        if ov.spec:
+            embed.add_field(name="Spec", value=ov.spec, inline=True)
 
-            embed.add_field(name="Item Level", value=ov.item_level, inline=True)
+        embed.add_field(name="Item Level", value=ov.item_level, inline=True)
 
+        if raiderio_pending:
+            mplus_value = raid_text = "Cargando…"
+        else:
             mplus_value = f"**Score:** {ov.mythic_plus.score}"
             if ov.mythic_plus.top_runs:
                 mplus_value += "\n" + "\n".join(ov.mythic_plus.top_runs)
-            embed.add_field(name="Mythic+ (Raider.IO)", value=mplus_value, inline=False)
-
             raid_text = "\n".join(ov.raid_progress_lines) if ov.raid_progress_lines else "—"
-            embed.add_field(name="Raid Progress (Raider.IO)", value=raid_text, inline=False)
+        embed.add_field(name="Mythic+ (Raider.IO)", value=mplus_value, inline=False)
+        embed.add_field(name="Raid Progress (Raider.IO)", value=raid_text, inline=False)
 
-            if ov.thumbnail_url:
-                embed.set_thumbnail(url=ov.thumbnail_url)
+        if ov.thumbnail_url:
+            embed.set_thumbnail(url=ov.thumbnail_url)
+        if ov.fetched_at:
+            embed.set_footer(text=f"Datos de hace {format_age(time.time() - ov.fetched_at)}")
+        return embed
 
-            await interaction.followup.send(embed=embed)
+    @app_commands.command(name="status", description="Estado aproximado de un reino.")
+    @app_commands.describe(region="Región (por defecto la del bot)")
+    async def status(self, interaction: discord.Interaction, reino: str, region: Region | None = None):
+        await interaction.response.defer(thinking=True)
+        svc = await self._region_services(interaction, region)
+        if svc is None:
+            return
+
+        realm_slug = await self._realm_slug(interaction, svc, reino)
+        if realm_slug is None:
+            return
 
+        try:
+            status_text = await svc.realms.get_realm_status_text(realm_slug=realm_slug)
+            embed = discord.Embed(title=f"Estado del reino: {reino} ({svc.region.upper()})")
+            embed.add_field(name="Estado", value=status_text, inline=False)
+            await interaction.followup.send(embed=embed)
         except WowNotFound:
             await interaction.followup.send(
-                f"No encuentro **{nombre}** en **{reino}** ({self._characters.region.upper()}).",
+                f"No encuentro el reino **{reino}** en {svc.region.upper()}.",
                 ephemeral=True,
             )
         except WowApiError as e:
-            await interaction.followup.send(
-                f"API respondió con error.\n`{e}`",
-                ephemeral=True,
-            )
+            await interaction.followup.send(f"Error Blizzard API:\n`{e}`", ephemeral=True)
 
-    @app_commands.command(name="status", description="Estado aproximado de un reino.")
-    async def status(self, interaction: discord.Interaction, reino: str):
+    @alertas.command(name="activar", description="Avisar en un canal cuando el reino cambie de estado.")
+    @app_commands.describe(canal="Canal donde avisar", region="Región (por defecto la del bot)")
+    async def alertas_activar(
+        self,
+        interaction: discord.Interaction,
+        reino: str,
+        canal: discord.TextChannel,
+        region: Region | None = None,
+    ):
+        await interaction.response.defer(ephemeral=True)
+        svc = await self._region_services(interaction, region)
+        if svc is None or interaction.guild_id is None:
+            return
+        realm_slug = await self._realm_slug(interaction, svc, reino)
+        if realm_slug is None:
+            return
+
+        await self._alerts.subscribe(RealmAlert(interaction.guild_id, canal.id, svc.region, realm_slug))
+        await interaction.followup.send(
+            f"Avisaré en {canal.mention} cuando **{reino}** ({svc.region.upper()}) cambie de estado.",
+            ephemeral=True,
+        )
+
+    @alertas.command(name="desactivar", description="Dejar de avisar de los cambios de estado de un reino.")
+    @app_commands.describe(region="Región (por defecto la del bot)")
+    async def alertas_desactivar(self, interaction: discord.Interaction, reino: str, region: Region | None = None):
+        await interaction.response.defer(ephemeral=True)
+        svc = await self._region_services(interaction, region)
+        if svc is None or interaction.guild_id is None:
+            return
+        realm_slug = await self._realm_slug(interaction, svc, reino)
+        if realm_slug is None:
+            return
+
+        if await self._alerts.unsubscribe(interaction.guild_id, svc.region, realm_slug):
+            text = f"Ya no avisaré de los cambios de **{reino}** ({svc.region.upper()})."
+        else:
+            text = f"No había alertas para **{reino}** ({svc.region.upper()})."
+        await interaction.followup.send(text, ephemeral=True)
+
+    @alertas.command(name="lista", description="Reinos con alertas en este servidor.")
+    async def alertas_lista(self, interaction: discord.Interaction):
+        alerts = self._alerts.for_guild(interaction.guild_id or 0)
+        if not alerts:
+            await interaction.response.send_message("No hay alertas de reinos en este servidor.", ephemeral=True)
+            return
+        lines = [f"**{a.realm_slug}** ({a.region.upper()}) → <#{a.channel_id}>" for a in alerts]
+        await interaction.response.send_message("\n".join(lines), ephemeral=True)
+
+    async def _on_realm_status_change(self, change: RealmStatusChange) -> None:
+        # Pushed by the region's status poller; channels of other shards/workers are skipped
+        try:
+            svc = self._services.get(change.region)
+        except ValueError:
+            return
+        members = {e.slug: e.name for e in svc.realms.directory.members(change.connected_realm_id)}
+        channels = self._alerts.channels_for(change.region, set(members))
+        if not channels:
+            return
+
+        if change.new == "UP":
+            template = "🟢 **{realms}** ({region}) vuelve a estar online."
+        elif change.new == "DOWN":
+            template = "🔴 **{realms}** ({region}) está offline."
+        else:
+            template = "**{realms}** ({region}) ha cambiado de estado: " + (change.new or "desconocido") + "."
+
+        for channel_id, slugs in channels.items():
+            channel = self.bot.get_channel(channel_id)
+            if not isinstance(channel, discord.abc.Messageable):
+                continue
+            text = template.format(realms=", ".join(sorted(members[s] for s in slugs)), region=change.region.upper())
+            try:
+                await channel.send(text)
+            except discord.HTTPException as e:
+                log.warning("Realm alert to channel %s failed: %s", channel_id, e)
+
+    @app_commands.command(name="hermandad", description="ilvl, spec y M+ de los miembros de una hermandad.")
+    @app_commands.describe(region="Región (por defecto la del bot)")
+    async def hermandad(
+        self,
+        interaction: discord.Interaction,
+        nombre: str,
+        reino: str,
+        region: Region | None = None,
+    ):
         await interaction.response.defer(thinking=True)
+        svc = await self._region_services(interaction, region)
+        if svc is None:
+            return
 
-        realm_slug = normalize_realm_slug(reino)
+        realm_slug = await self._realm_slug(interaction, svc, reino)
+        if realm_slug is None:
+            return
+        guild_slug = normalize_guild_slug(nombre)
 
         try:
-            status_text = await self._realms.get_realm_status_text(realm_slug=realm_slug)
-            embed = discord.Embed(title=f"Estado del reino: {reino} ({self._realms.region.upper()})")
-            embed.add_field(name="Estado", value=status_text, inline=False)
-            await interaction.followup.send(embed=embed)
+            roster = await svc.guilds.get_roster(realm_slug=realm_slug, guild_slug=guild_slug)
         except WowNotFound:
             await interaction.followup.send(
-                f"No encuentro el reino **{reino}** en {self._realms.region.upper()}.",
+                f"No encuentro la hermandad **{nombre}** en **{reino}** ({svc.region.upper()}).",
                 ephemeral=True,
             )
+            return
         except WowApiError as e:
-            await interaction.followup.send(f"Error Blizzard API:\n`{e}`", ephemeral=True)
+            await interaction.followup.send(f"API respondió con error.\n`{e}`", ephemeral=True)
+            return
+
+        results: list[MemberResult] = []
+        message = await interaction.followup.send(embed=self._guild_embed(svc, roster, reino, results), wait=True)
+
+        # Stream partial results by editing the message as members finish
+        last_edit = time.monotonic()
+        async for result in svc.guilds.iter_member_summaries(roster.members):
+            results.append(result)
+            if time.monotonic() - last_edit >= GUILD_EDIT_INTERVAL:
+                await self._try_edit(message, self._guild_embed(svc, roster, reino, results))
+                last_edit = time.monotonic()
+
+        await self._try_edit(message, self._guild_embed(svc, roster, reino, results))
+
+    @personaje.autocomplete("reino")
+    @status.autocomplete("reino")
+    @hermandad.autocomplete("reino")
+    @alertas_activar.autocomplete("reino")
+    @alertas_desactivar.autocomplete("reino")
+    async def _reino_autocomplete(
+        self, interaction: discord.Interaction, current: str
+    ) -> list[app_commands.Choice[str]]:
+        # Served from memory only: autocomplete can't be deferred and Discord gives it 3s
+        try:
+            svc = self._services.get(getattr(interaction.namespace, "region", None))
+        except ValueError:
+            return []
+        return [app_commands.Choice(name=e.name, value=e.name) for e in svc.realms.directory.suggest(current)]
+
+    @staticmethod
+    async def _try_edit(message: discord.WebhookMessage, embed: discord.Embed) -> None:
+        # A failed progress edit must not abort the batch behind it
+        try:
+            await message.edit(embed=embed)
+        except discord.HTTPException:
+            pass
+
+    @staticmethod
+    def _guild_embed(
+        svc: RegionServices,
+        roster: GuildRoster,
+        reino: str,
+        results: list[MemberResult],
+    ) -> discord.Embed:
+        def ilvl_key(r: MemberResult) -> float:
+            try:
+                return float(r.summary.item_level) if r.summary else 0.0
+            except ValueError:
+                return 0.0
+
+        ok = sorted((r for r in results if r.summary), key=ilvl_key, reverse=True)
+        lines = []
+        for r in ok[:GUILD_MAX_LINES]:
+            sm = r.summary
+            assert sm is not None
+            spec = f"{sm.spec} {sm.class_name}" if sm.spec else sm.class_name
+            lines.append(f"`{sm.item_level:>5}` **{r.member.name.title()}** — {spec} · M+ {sm.mythic_plus_score}")
+
+        total = len(roster.members)
+        failed = len(results) - len(ok)
+        embed = discord.Embed(
+            title=f"{roster.name} - {reino} ({svc.region.upper()})",
+            description="\n".join(lines) if lines else "Cargando miembros…",
+        )
+        footer = f"{len(results)}/{total} miembros procesados"
+        if failed:
+            footer += f" · {failed} con error"
+        if len(ok) > GUILD_MAX_LINES:
+            footer += f" · top {GUILD_MAX_LINES} por ilvl"
+        embed.set_footer(text=footer)
+        return embed
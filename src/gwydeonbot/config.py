@@ -6,6 +6,11 @@ import os
 
 from dotenv import load_dotenv
 
+from .utils.text import normalize_character_name, normalize_realm_slug
+
+# Battle.net API regions the bot can serve (CN has its own, separate API)
+SUPPORTED_REGIONS = ("eu", "us", "kr", "tw")
+
 
 def _load_env() -> None:
     """Load .env from repo root if present; fallback to default behaviour."""
@@ -28,7 +33,71 @@ class Settings:
     blizzard_client_secret: str
     wow_region: str = "eu"
     wow_locale: str = "es_ES"
+    # Regions this process serves; clients are built lazily per region
+    wow_regions: tuple[str, ...] = ("eu", "us", "kr", "tw")
     discord_guild_id: int | None = None
+    # Shared cache tier: "memory", "sqlite" (cache_url = file path) or "redis" (cache_url = redis://...)
+    cache_backend: str | None = None
+    cache_url: str | None = None
+    raiderio_requests_per_minute: float = 200
+    ratelimit_max_wait: float = 5.0
+    http_limit_per_host: int = 20
+    http_dns_cache_ttl: int = 300
+    metrics_port: int | None = None
+    # 404s are remembered briefly so typos don't hit the APIs on every retry
+    not_found_ttl: float = 60
+    not_found_max_entries: int = 10_000
+    # Sharding: None lets discord.py / Discord pick the shard count
+    shard_count: int | None = None
+    # Worker processes for cluster mode; 1 runs everything in this process
+    cluster_workers: int = 1
+    cluster_cpu_affinity: bool = True
+    # Characters kept warm in the background: (region, realm slug, name)
+    prefetch_watchlist: tuple[tuple[str, str, str], ...] = ()
+    prefetch_budget_per_minute: float = 60  # 0 disables the scheduler
+    prefetch_off_peak_hours: tuple[int, int] | None = None
+    realm_status_poll_seconds: float = 60  # 0 disables the poller
+    realm_alerts_path: str = ".data/realm_alerts.json"
+    # Fingerprint of the last synced command tree (delete it to force a sync)
+    command_sync_state_path: str = ".data/command_tree.json"
+
+
+def _parse_watchlist(raw: str, default_region: str) -> tuple[tuple[str, str, str], ...]:
+    # "eu:sanguino/pepito, us:ragnaros/juan" (region prefix optional)
+    entries: list[tuple[str, str, str]] = []
+    for item in raw.split(","):
+        item = item.strip()
+        if not item or "/" not in item:
+            continue
+        region, _, rest = item.rpartition(":")
+        region = (region or default_region).lower()
+        if region not in SUPPORTED_REGIONS:
+            raise RuntimeError(
+                f"Región no soportada en PREFETCH_WATCHLIST: {item!r} (válidas: {', '.join(SUPPORTED_REGIONS)})"
+            )
+        realm, _, name = rest.partition("/")
+        entries.append((
+            region,
+            normalize_realm_slug(realm),
+            normalize_character_name(name),
+        ))
+    return tuple(entries)
+
+
+def _parse_hours(raw: str) -> tuple[int, int] | None:
+    # "2-8" -> (2, 8)
+    if not raw:
+        return None
+    start, sep, end = raw.partition("-")
+    try:
+        hours = int(start), int(end)
+    except ValueError:
+        hours = None
+    if not sep or hours is None or not all(0 <= h <= 23 for h in hours) or hours[0] == hours[1]:
+        raise RuntimeError(
+            f"PREFETCH_OFF_PEAK_HOURS inválido: {raw!r} (formato inicio-fin, horas 0-23 distintas, p. ej. 2-8)"
+        )
+    return hours
 
 
 def get_settings() -> Settings:
@@ -41,13 +110,51 @@ def get_settings() -> Settings:
         return v or ""
 
     guild_id = os.getenv("DISCORD_GUILD_ID")
+    metrics_port = os.getenv("METRICS_PORT")
+    shard_count = os.getenv("SHARD_COUNT")
+    cache_backend = (os.getenv("CACHE_BACKEND") or "").lower() or None
+    cache_url = os.getenv("CACHE_URL") or None
+    if cache_backend is None and os.getenv("DISK_CACHE_PATH"):
+        # Older configs: DISK_CACHE_PATH alone means the SQLite backend
+        cache_backend, cache_url = "sqlite", os.getenv("DISK_CACHE_PATH")
+    wow_region = os.getenv("WOW_REGION", "eu").lower()
+    wow_regions = tuple(
+        r.strip().lower() for r in os.getenv("WOW_REGIONS", "eu,us,kr,tw").split(",") if r.strip()
+    )
+    if wow_region not in wow_regions:
+        wow_regions = (wow_region, *wow_regions)
+    unsupported = [r for r in wow_regions if r not in SUPPORTED_REGIONS]
+    if unsupported:
+        raise RuntimeError(
+            f"Regiones no soportadas en WOW_REGION/WOW_REGIONS: {', '.join(unsupported)} "
+            f"(válidas: {', '.join(SUPPORTED_REGIONS)})"
+        )
     settings = Settings(
         discord_token=must("DISCORD_TOKEN"),
         blizzard_client_id=must("BLIZZARD_CLIENT_ID"),
         blizzard_client_secret=must("BLIZZARD_CLIENT_SECRET"),
-        wow_region=os.getenv("WOW_REGION", "eu"),
+        wow_region=wow_region,
+        wow_regions=wow_regions,
         wow_locale=os.getenv("WOW_LOCALE", "es_ES"),
         discord_guild_id=int(guild_id) if guild_id else None,
+        cache_backend=cache_backend,
+        cache_url=cache_url,
+        raiderio_requests_per_minute=float(os.getenv("RAIDERIO_REQUESTS_PER_MINUTE", "200")),
+        ratelimit_max_wait=float(os.getenv("RATELIMIT_MAX_WAIT", "5")),
+        http_limit_per_host=int(os.getenv("HTTP_LIMIT_PER_HOST", "20")),
+        http_dns_cache_ttl=int(os.getenv("HTTP_DNS_CACHE_TTL", "300")),
+        metrics_port=int(metrics_port) if metrics_port else None,
+        not_found_ttl=float(os.getenv("NOT_FOUND_TTL", "60")),
+        not_found_max_entries=int(os.getenv("NOT_FOUND_MAX_ENTRIES", "10000")),
+        shard_count=int(shard_count) if shard_count else None,
+        cluster_workers=int(os.getenv("CLUSTER_WORKERS", "1")),
+        cluster_cpu_affinity=os.getenv("CLUSTER_CPU_AFFINITY", "1").lower() not in ("0", "false", "no"),
+        prefetch_watchlist=_parse_watchlist(os.getenv("PREFETCH_WATCHLIST", ""), wow_region),
+        prefetch_budget_per_minute=float(os.getenv("PREFETCH_BUDGET_PER_MINUTE", "60")),
+        prefetch_off_peak_hours=_parse_hours(os.getenv("PREFETCH_OFF_PEAK_HOURS", "")),
+        realm_status_poll_seconds=float(os.getenv("REALM_STATUS_POLL_SECONDS", "60")),
+        realm_alerts_path=os.getenv("REALM_ALERTS_PATH", ".data/realm_alerts.json"),
+        command_sync_state_path=os.getenv("COMMAND_SYNC_STATE_PATH", ".data/command_tree.json"),
     )
 
     if missing:
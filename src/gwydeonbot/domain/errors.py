@@ -8,3 +8,16 @@ class WowNotFound(WowApiError):
 
 class WowRateLimited(WowApiError):
     """Rate limit from a remote API (429)."""
+
+    def __init__(self, *args: object, retry_after: float | None = None):
+        super().__init__(*args)
+        # Set for upstream 429s; None when our own limiter gave up waiting
+        self.retry_after = retry_after
+
+
+class WowUpstreamError(WowApiError):
+    """Transient upstream failure (5xx, timeout, network). Safe to retry."""
+
+
+class WowUnavailable(WowApiError):
+    """Upstream circuit is open; failing fast without calling it."""
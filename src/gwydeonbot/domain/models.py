@@ -2,14 +2,18 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 
+# Models are cached in bulk: slotted, immutable, and holding tuples, with the
+# repeating strings (realm, class, race, faction, dungeon names) interned by
+# the services that build them.
 
-@dataclass(frozen=True)
+
+@dataclass(frozen=True, slots=True)
 class MythicPlusSummary:
     score: str
-    top_runs: list[str]
+    top_runs: tuple[str, ...]
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class CharacterOverview:
     name: str
     realm: str
@@ -25,4 +29,30 @@ class CharacterOverview:
     thumbnail_url: str | None
     armory_url: str
     mythic_plus: MythicPlusSummary
-    raid_progress_lines: list[str]
+    raid_progress_lines: tuple[str, ...]
+    fetched_at: float | None = None  # epoch seconds when upstream data was fetched
+
+
+@dataclass(frozen=True, slots=True)
+class GuildMember:
+    name: str
+    realm: str
+    level: int
+    class_id: int | None
+    rank: int
+
+
+@dataclass(frozen=True, slots=True)
+class GuildRoster:
+    name: str
+    realm: str
+    members: tuple[GuildMember, ...]
+
+
+@dataclass(frozen=True, slots=True)
+class GuildMemberSummary:
+    member: GuildMember
+    class_name: str
+    spec: str | None
+    item_level: str
+    mythic_plus_score: str
@@ -1,11 +1,26 @@
 from __future__ import annotations
 
-from .bot import GwydeonBot
+from .config import get_settings
+from .startup import StartupTimer
 
 
 def main() -> None:
-    bot = GwydeonBot()
-    bot.run(bot.settings.discord_token)
+    startup = StartupTimer()
+    settings = get_settings()
+    if settings.cluster_workers > 1:
+        from .cluster import Supervisor
+        from .logging import configure_logging
+
+        configure_logging()
+        Supervisor(settings).run()
+        return
+
+    # Imported here: the cluster supervisor never needs discord.py loaded
+    from .bot import GwydeonBot
+
+    startup.mark("imports")
+    bot = GwydeonBot(settings, startup=startup)
+    bot.run(settings.discord_token)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import logging
+from bisect import bisect_left
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+
+log = logging.getLogger(__name__)
+
+# Seconds; covers cache hits (sub-ms) through slow upstream calls
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0)
+
+Labels = tuple[str, ...]
+
+
+@dataclass
+class Sample:
+    name: str
+    labels: dict[str, str]
+    value: float
+
+
+@dataclass
+class MetricFamily:
+    name: str
+    type: str  # counter / gauge / histogram
+    help: str
+    samples: list[Sample] = field(default_factory=list)
+
+    def add(self, value: float, suffix: str = "", **labels: str) -> None:
+        self.samples.append(Sample(self.name + suffix, labels, value))
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labelnames: Labels = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self._values: dict[Labels, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def collect(self) -> MetricFamily:
+        fam = MetricFamily(self.name, "counter", self.help)
+        for labels, v in self._values.items():
+            fam.add(v, **dict(zip(self.labelnames, labels)))
+        return fam
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labelnames: Labels = (), buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self._buckets = buckets
+        # labels -> [per-bucket counts..., +Inf count, sum]
+        self._series: dict[Labels, list[float]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        s = self._series.get(labels)
+        if s is None:
+            s = self._series[labels] = [0.0] * (len(self._buckets) + 2)
+        s[bisect_left(self._buckets, value)] += 1
+        s[-1] += value
+
+    def collect(self) -> MetricFamily:
+        fam = MetricFamily(self.name, "histogram", self.help)
+        for labels, s in self._series.items():
+            base = dict(zip(self.labelnames, labels))
+            cumulative = 0.0
+            for bound, n in zip(self._buckets, s):
+                cumulative += n
+                fam.add(cumulative, "_bucket", **base, le=repr(bound))
+            cumulative += s[len(self._buckets)]
+            fam.add(cumulative, "_bucket", **base, le="+Inf")
+            fam.add(cumulative, "_count", **base)
+            fam.add(s[-1], "_sum", **base)
+        return fam
+
+
+Collector = Callable[[], Iterable[MetricFamily]]
+
+
+class MetricsRegistry:
+    """Process-wide metrics, rendered in Prometheus text format on demand.
+
+    Counters and histograms are updated inline (a dict lookup and an add).
+    Anything that already keeps its own stats (caches, limiters, breakers)
+    is read by a collector at scrape time instead, so it costs nothing
+    on the hot path.
+    """
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, Counter | Histogram] = {}
+        self._collectors: list[Collector] = []
+
+    def counter(self, name: str, help: str, labelnames: Labels = ()) -> Counter:
+        m = self._metrics.get(name)
+        if m is None:
+            m = self._metrics[name] = Counter(name, help, labelnames)
+        assert isinstance(m, Counter)
+        return m
+
+    def histogram(self, name: str, help: str, labelnames: Labels = (), buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        m = self._metrics.get(name)
+        if m is None:
+            m = self._metrics[name] = Histogram(name, help, labelnames, buckets)
+        assert isinstance(m, Histogram)
+        return m
+
+    def register_collector(self, collector: Collector) -> None:
+        self._collectors.append(collector)
+
+    def unregister_collector(self, collector: Collector) -> None:
+        if collector in self._collectors:
+            self._collectors.remove(collector)
+
+    def collect(self) -> list[MetricFamily]:
+        families = [m.collect() for m in self._metrics.values()]
+        for c in self._collectors:
+            try:
+                families.extend(c())
+            except Exception:
+                log.exception("Metrics collector failed")
+        return families
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for fam in self.collect():
+            lines.append(f"# HELP {fam.name} {fam.help}")
+            lines.append(f"# TYPE {fam.name} {fam.type}")
+            for s in fam.samples:
+                if s.labels:
+                    label_str = ",".join(f'{k}="{_escape(v)}"' for k, v in s.labels.items())
+                    lines.append(f"{s.name}{{{label_str}}} {s.value:g}")
+                else:
+                    lines.append(f"{s.name} {s.value:g}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(v: str) -> str:
+    return str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+REGISTRY = MetricsRegistry()
+
+UPSTREAM_LATENCY = REGISTRY.histogram(
+    "gwydeonbot_upstream_request_seconds",
+    "Latency of upstream HTTP requests.",
+    ("upstream", "method", "endpoint", "status"),
+)
+OAUTH_REFRESHES = REGISTRY.counter(
+    "gwydeonbot_oauth_refreshes_total",
+    "Battle.net OAuth token refreshes.",
+    ("result",),
+)
+COMMAND_LATENCY = REGISTRY.histogram(
+    "gwydeonbot_command_seconds",
+    "End-to-end latency of app commands, from interaction creation to completion.",
+    ("command",),
+)
+
+
+class MetricsServer:
+    """Serves ``REGISTRY`` at ``/metrics`` on a local port."""
+
+    def __init__(self, registry: MetricsRegistry = REGISTRY, *, host: str = "127.0.0.1", port: int = 9108):
+        self._registry = registry
+        self._host = host
+        self._port = port
+        self._runner = None
+
+    async def start(self) -> None:
+        from aiohttp import web
+
+        async def handle(_request: web.Request) -> web.Response:
+            return web.Response(text=self._registry.render(), content_type="text/plain", charset="utf-8")
+
+        app = web.Application()
+        app.router.add_get("/metrics", handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self._host, self._port).start()
+        log.info("Metrics on http://%s:%d/metrics", self._host, self._port)
+
+    async def close(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
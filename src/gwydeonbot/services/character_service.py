@@ -1,12 +1,61 @@
 from __future__ import annotations
 
-from typing import Any
+import asyncio
+import logging
+import sys
+import time
+from dataclasses import asdict, dataclass, replace
+from typing import Any, Awaitable, Callable, TypeVar
 
 from ..clients.blizzard_api import BlizzardApiClient
 from ..clients.raiderio_api import RaiderIoClient
-from ..domain.errors import WowNotFound, WowRateLimited
-from ..domain.models import CharacterOverview, MythicPlusSummary
-from ..utils.cache import TTLCache
+from ..domain.errors import WowApiError, WowNotFound, WowRateLimited, WowUnavailable, WowUpstreamError
+from ..domain.models import CharacterOverview, GuildMember, GuildMemberSummary, MythicPlusSummary
+from ..utils.aio import gather_or_cancel
+from ..utils.cache import CacheStats, TTLCache
+from ..utils.cache_backend import TieredCache
+from ..utils.ratelimit import Priority, request_priority
+from ..utils.singleflight import SingleFlight
+
+log = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_CharKey = tuple[str, str]
+_RaiderSummary = tuple[MythicPlusSummary, tuple[str, ...]]
+
+_RATE_LIMITED_NOTE = "Rate limit en Raider.IO. Prueba en 1–2 min."
+_NO_RAIDERIO: _RaiderSummary = (MythicPlusSummary(score="—", top_runs=()), ())
+_RAIDERIO_RATE_LIMITED: _RaiderSummary = (
+    MythicPlusSummary(score="—", top_runs=(_RATE_LIMITED_NOTE,)),
+    (_RATE_LIMITED_NOTE,),
+)
+_RAIDERIO_DOWN: _RaiderSummary = (
+    MythicPlusSummary(score="—", top_runs=("Raider.IO no disponible ahora mismo.",)),
+    (),
+)
+_RAIDERIO_TIMEOUT = MythicPlusSummary(score="—", top_runs=("Raider.IO no respondió a tiempo.",))
+# Stand-ins for data a transient failure kept out of an overview
+_DEGRADED_MYTHIC_PLUS = (_RAIDERIO_RATE_LIMITED[0], _RAIDERIO_DOWN[0], _RAIDERIO_TIMEOUT)
+
+
+@dataclass(frozen=True, slots=True)
+class _CachedOverview:
+    overview: CharacterOverview
+    stored_at: float  # time.monotonic()
+
+
+def _interned(value: Any, default: str = "—") -> str:
+    return sys.intern(str(value)) if value else default
+
+
+async def _or_none(aw: Awaitable[T]) -> T | None:
+    try:
+        return await aw
+    except asyncio.CancelledError:
+        raise
+    except Exception:
+        return None
 
 
 class CharacterService:
@@ -16,41 +65,226 @@ class CharacterService:
         raiderio: RaiderIoClient,
         *,
         raiderio_ttl_seconds: float = 120,
+        overview_soft_ttl_seconds: float = 60,
+        overview_hard_ttl_seconds: float = 600,
+        overview_degraded_ttl_seconds: float = 30,
+        raiderio_patch_timeout_seconds: float = 8,
+        shared_cache: TieredCache | None = None,
     ):
         self._blizzard = blizzard
         self._raiderio = raiderio
-        self._raider_cache: TTLCache[tuple[str, str], dict[str, Any]] = TTLCache(raiderio_ttl_seconds)
+        # Pre-extracted summaries, not raw payloads: a hit is a dict lookup
+        self._raider_cache: TTLCache[_CharKey, _RaiderSummary] = TTLCache(raiderio_ttl_seconds, max_entries=20_000)
+        self._raiderio_ttl = raiderio_ttl_seconds
+        self._shared = shared_cache
+        # Stale-while-revalidate: fresh until the soft TTL, served stale (with a
+        # background refresh) until the hard TTL, refetched inline after that
+        self._overview_soft_ttl = overview_soft_ttl_seconds
+        self._overview_cache: TTLCache[_CharKey, _CachedOverview] = TTLCache(
+            overview_hard_ttl_seconds,
+            max_entries=5_000,
+        )
+        # Overviews with placeholders only stay long enough to absorb a burst
+        self._overview_degraded_ttl = overview_degraded_ttl_seconds
+        self._overview_flight: SingleFlight[_CharKey, CharacterOverview] = SingleFlight()
+        self._background: set[asyncio.Task[Any]] = set()
+        self._raiderio_patch_timeout = raiderio_patch_timeout_seconds
+        # Prefetch support: interactive lookups are reported to ``on_lookup``,
+        # and hits on entries a prefetch put there are counted
+        self.on_lookup: Callable[[str, str], None] | None = None
+        self.prefetch_hits = 0
+        self._prefetched: set[_CharKey] = set()
 
     @property
     def region(self) -> str:
         return self._blizzard.region
 
+    def cache_stats(self) -> dict[str, CacheStats]:
+        return {"raiderio": self._raider_cache.stats, "overview": self._overview_cache.stats}
+
     async def get_character_overview(self, *, realm_slug: str, character_name: str) -> CharacterOverview:
-        profile = await self._blizzard.character_profile_summary(realm_slug, character_name)
+        key = (realm_slug, character_name)
+        cached = self._cached_overview(key)
+        if cached is not None:
+            return cached
+        return await self._overview_flight.do(key, lambda: self._load_overview(key))
+
+    async def get_character_overview_progressive(
+        self, *, realm_slug: str, character_name: str
+    ) -> tuple[CharacterOverview, asyncio.Task[CharacterOverview] | None]:
+        """Overview as soon as the Blizzard data is in, plus a task for the rest.
+
+        The task resolves to the same overview with the Raider.IO fields filled
+        in (degraded on timeout). It is None when the overview came from cache,
+        or from a load of the same character that was already in flight.
+        """
+        key = (realm_slug, character_name)
+        cached = self._cached_overview(key)
+        if cached is not None:
+            return cached, None
+        if key in self._overview_flight:
+            return await self._overview_flight.do(key, lambda: self._load_overview(key)), None
+
+        partial_ready: asyncio.Future[CharacterOverview] = asyncio.get_running_loop().create_future()
+
+        async def load() -> CharacterOverview:
+            raider = asyncio.ensure_future(self._resolve_raiderio(realm_slug, character_name))
+            try:
+                partial = await self._fetch_blizzard_overview(realm_slug, character_name)
+            except BaseException:
+                raider.cancel()
+                raise
+            partial_ready.set_result(partial)
+            return await self._complete_overview(key, partial, raider)
+
+        # Through the flight, so lookups of this character meanwhile share the load
+        task = asyncio.ensure_future(self._overview_flight.do(key, load))
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+        await asyncio.wait((partial_ready, task), return_when=asyncio.FIRST_COMPLETED)
+        if not partial_ready.done():
+            # Failed before the Blizzard data was in, or joined another caller's load
+            return task.result(), None
+        return partial_ready.result(), task
+
+    async def prefetch_overview(self, *, realm_slug: str, character_name: str, max_age: float) -> bool:
+        """Refresh a cached overview older than ``max_age`` seconds (or missing).
+
+        Returns whether anything was fetched. Not reported as a lookup. With a
+        shared cache the refresh is published there, and one another process
+        published within ``max_age`` is adopted instead of fetching again.
+        """
+        key = (realm_slug, character_name)
+        cached = self._overview_cache.peek(key)
+        if cached is not None and time.monotonic() - cached.stored_at < max_age:
+            return False
+        if self._shared is None:
+            await self._overview_flight.do(key, lambda: self._load_overview(key, prefetch=True))
+            return True
+
+        shared_key = f"overview:{self.region}:{realm_slug}:{character_name}"
+        shared = await self._shared.get(shared_key)
+        if shared is not None:
+            overview = self._overview_from_json(shared)
+            age = time.time() - (overview.fetched_at or 0.0)
+            if age < max_age:
+                self._store_overview(key, overview, prefetch=True, age=age)
+                return False
+
+        overview = await self._overview_flight.do(key, lambda: self._load_overview(key, prefetch=True))
+        if not self._is_degraded(overview):
+            self._shared.set(shared_key, self._overview_to_json(overview), max_age)
+        return True
+
+    def _cached_overview(self, key: _CharKey) -> CharacterOverview | None:
+        if self.on_lookup is not None:
+            self.on_lookup(*key)
+        cached = self._overview_cache.get(key)
+        if cached is None:
+            return None
+        if key in self._prefetched:
+            self.prefetch_hits += 1
+        if time.monotonic() - cached.stored_at >= self._overview_soft_ttl:
+            self._refresh_in_background(key)
+        return cached.overview
+
+    async def _complete_overview(
+        self,
+        key: _CharKey,
+        partial: CharacterOverview,
+        raider: asyncio.Future[_RaiderSummary],
+    ) -> CharacterOverview:
+        try:
+            mythic_plus, raid_lines = await asyncio.wait_for(raider, self._raiderio_patch_timeout)
+        except asyncio.TimeoutError:
+            mythic_plus, raid_lines = _RAIDERIO_TIMEOUT, ()
+        except WowApiError:
+            mythic_plus, raid_lines = _RAIDERIO_DOWN
+
+        # Placeholders (timeout, outage, rate limit) are only kept briefly
+        overview = replace(partial, mythic_plus=mythic_plus, raid_progress_lines=raid_lines)
+        self._store_overview(key, overview)
+        return overview
+
+    def _refresh_in_background(self, key: _CharKey) -> None:
+        if key in self._overview_flight:
+            return
+
+        async def refresh() -> None:
+            try:
+                await self._overview_flight.do(key, lambda: self._load_overview(key))
+            except Exception as e:
+                log.debug("Background refresh of %s-%s failed: %s", key[1], key[0], e)
+
+        with request_priority(Priority.BACKGROUND):
+            task = asyncio.create_task(refresh())
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def close(self) -> None:
+        tasks = list(self._background)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _load_overview(self, key: _CharKey, *, prefetch: bool = False) -> CharacterOverview:
+        overview = await self._fetch_overview(realm_slug=key[0], character_name=key[1])
+        self._store_overview(key, overview, prefetch=prefetch)
+        return overview
+
+    def _store_overview(
+        self, key: _CharKey, overview: CharacterOverview, *, prefetch: bool = False, age: float = 0.0
+    ) -> None:
+        self._overview_cache.set(
+            key,
+            _CachedOverview(overview=overview, stored_at=time.monotonic() - age),
+            self._overview_degraded_ttl if self._is_degraded(overview) else None,
+        )
+        if prefetch:
+            self._prefetched.add(key)
+        else:
+            self._prefetched.discard(key)
+
+    @staticmethod
+    def _is_degraded(overview: CharacterOverview) -> bool:
+        return overview.item_level == "—" or overview.mythic_plus in _DEGRADED_MYTHIC_PLUS
+
+    async def _fetch_overview(self, *, realm_slug: str, character_name: str) -> CharacterOverview:
+        # A missing character (404 on the profile) cancels the Raider.IO branch
+        partial, (mythic_plus, raid_lines) = await gather_or_cancel(
+            self._fetch_blizzard_overview(realm_slug, character_name),
+            self._resolve_raiderio(realm_slug, character_name),
+        )
+        return replace(partial, mythic_plus=mythic_plus, raid_progress_lines=raid_lines)
+
+    async def _fetch_blizzard_overview(self, realm_slug: str, character_name: str) -> CharacterOverview:
+        """Overview from Blizzard data only; the Raider.IO fields are left empty."""
+        # Everything after the profile is independent of it, so fan out at once
+        profile, ilvl, thumbnail_url = await gather_or_cancel(
+            self._blizzard.character_profile_summary(realm_slug, character_name),
+            self._resolve_item_level(realm_slug, character_name),
+            self._resolve_thumbnail(realm_slug, character_name),
+        )
 
         level = str(profile.get("level", "—"))
         class_obj = profile.get("character_class") or {}
-        class_name = str(class_obj.get("name", "—"))
+        class_name = _interned(class_obj.get("name"))
         class_id = class_obj.get("id") if isinstance(class_obj, dict) else None
         if not isinstance(class_id, int):
             class_id = None
 
-        faction = str((profile.get("faction") or {}).get("name", "—"))
-        race = str((profile.get("race") or {}).get("name", "—"))
+        faction = _interned((profile.get("faction") or {}).get("name"))
+        race = _interned((profile.get("race") or {}).get("name"))
         spec = (profile.get("active_spec") or {}).get("name")
-        spec = str(spec) if spec else None
+        spec = _interned(spec) if spec else None
         guild = (profile.get("guild") or {}).get("name")
-        guild = str(guild) if guild else None
+        guild = _interned(guild) if guild else None
 
-        ilvl = await self._resolve_item_level(realm_slug, character_name)
-        thumbnail_url = await self._resolve_thumbnail(realm_slug, character_name)
         armory_url = self._blizzard.armory_character_url(realm_slug, character_name)
 
-        mythic_plus, raid_lines = await self._resolve_raiderio(realm_slug, character_name)
-
         return CharacterOverview(
             name=str(profile.get("name", character_name)),
-            realm=realm_slug,
+            realm=sys.intern(realm_slug),
             region=self._blizzard.region,
             level=level,
             class_name=class_name,
@@ -62,37 +296,57 @@ class CharacterService:
             item_level=ilvl,
             thumbnail_url=thumbnail_url,
             armory_url=armory_url,
-            mythic_plus=mythic_plus,
-            raid_progress_lines=raid_lines,
+            mythic_plus=_NO_RAIDERIO[0],
+            raid_progress_lines=_NO_RAIDERIO[1],
+            fetched_at=time.time(),
+        )
+
+    async def get_member_summary(self, member: GuildMember) -> GuildMemberSummary:
+        """Lightweight overview for roster listings: profile + Raider.IO score."""
+        profile, (mythic_plus, _) = await gather_or_cancel(
+            self._blizzard.character_profile_summary(member.realm, member.name),
+            self._resolve_raiderio(member.realm, member.name),
+        )
+
+        # The profile usually carries the ilvl already; only fall back if not
+        ilvl = profile.get("equipped_item_level")
+        if isinstance(ilvl, int) and ilvl > 0:
+            item_level = str(ilvl)
+        else:
+            item_level = await self._resolve_item_level(member.realm, member.name)
+
+        spec = (profile.get("active_spec") or {}).get("name")
+        return GuildMemberSummary(
+            member=member,
+            class_name=_interned((profile.get("character_class") or {}).get("name")),
+            spec=_interned(spec) if spec else None,
+            item_level=item_level,
+            mythic_plus_score=mythic_plus.score,
         )
 
     async def _resolve_item_level(self, realm_slug: str, character_name: str) -> str:
+        equip, stats = await asyncio.gather(
+            _or_none(self._blizzard.character_equipment_summary(realm_slug, character_name)),
+            _or_none(self._blizzard.character_statistics(realm_slug, character_name)),
+        )
+
         # 1) equipped_item_level (most reliable)
-        equip: dict[str, Any] | None = None
-        try:
-            equip = await self._blizzard.character_equipment_summary(realm_slug, character_name)
+        if equip is not None:
             direct = equip.get("equipped_item_level")
             if isinstance(direct, int) and direct > 0:
                 return str(direct)
-        except Exception:
-            equip = None
 
         # 2) statistics average_item_level_equipped
-        try:
-            stats = await self._blizzard.character_statistics(realm_slug, character_name)
+        if stats is not None:
             v = stats.get("average_item_level_equipped")
             if isinstance(v, int) and v > 0:
                 return str(v)
             v2 = stats.get("average_item_level")
             if isinstance(v2, int) and v2 > 0:
                 return str(v2)
-        except Exception:
-            pass
 
         # 3) average from equipped_items[].level.value
-        try:
-            if equip is None:
-                equip = await self._blizzard.character_equipment_summary(realm_slug, character_name)
+        if equip is not None:
             items = equip.get("equipped_items") or []
             levels: list[int] = []
             if isinstance(items, list):
@@ -104,8 +358,6 @@ class CharacterService:
                         levels.append(val)
             if levels:
                 return str(round(sum(levels) / len(levels), 1))
-        except Exception:
-            pass
 
         return "—"
 
@@ -125,32 +377,71 @@ class CharacterService:
             return None
         return None
 
-    async def _resolve_raiderio(self, realm_slug: str, character_name: str) -> tuple[MythicPlusSummary, list[str]]:
+    async def _resolve_raiderio(self, realm_slug: str, character_name: str) -> _RaiderSummary:
         # Raider.IO can be missing for a character even if Blizzard has it
         cache_key = (realm_slug, character_name)
-        payload = self._raider_cache.get(cache_key)
-        if payload is None:
-            try:
-                payload = await self._raiderio.character_profile(
-                    realm_slug,
-                    character_name,
-                    fields=[
-                        "raid_progression",
-                        "mythic_plus_scores_by_season:current",
-                        "mythic_plus_best_runs",
-                    ],
-                )
-                self._raider_cache.set(cache_key, payload)
-            except WowNotFound:
-                return MythicPlusSummary(score="—", top_runs=[]), []
-            except WowRateLimited:
-                return MythicPlusSummary(score="—", top_runs=["Rate limit en Raider.IO. Prueba en 1–2 min."]), [
-                    "Rate limit en Raider.IO. Prueba en 1–2 min.",
-                ]
-
-        mplus = self._extract_mplus(payload)
-        raids = self._extract_raid_progress(payload)
-        return mplus, raids
+        summary = self._raider_cache.get(cache_key)
+        if summary is not None:
+            return summary
+
+        shared_key = f"raiderio:{self.region}:{realm_slug}:{character_name}"
+        if self._shared is not None:
+            shared = await self._shared.get(shared_key)
+            if shared is not None:
+                summary = self._summary_from_json(shared)
+                self._raider_cache.set(cache_key, summary)
+                return summary
+
+        try:
+            payload = await self._raiderio.character_profile(
+                realm_slug,
+                character_name,
+                fields=[
+                    "raid_progression",
+                    "mythic_plus_scores_by_season:current",
+                    "mythic_plus_best_runs",
+                ],
+            )
+        except WowNotFound:
+            return _NO_RAIDERIO
+        except WowRateLimited:
+            return _RAIDERIO_RATE_LIMITED
+        except (WowUnavailable, WowUpstreamError):
+            # Raider.IO outage: don't take the Blizzard data down with it
+            return _RAIDERIO_DOWN
+
+        # Project once; the raw payload is dropped right here
+        summary = (self._extract_mplus(payload), tuple(map(sys.intern, self._extract_raid_progress(payload))))
+        self._raider_cache.set(cache_key, summary)
+        if self._shared is not None:
+            self._shared.set(shared_key, self._summary_to_json(summary), self._raiderio_ttl)
+        return summary
+
+    @staticmethod
+    def _summary_to_json(summary: _RaiderSummary) -> dict[str, Any]:
+        mplus, raids = summary
+        return {"score": mplus.score, "runs": list(mplus.top_runs), "raids": list(raids)}
+
+    @staticmethod
+    def _summary_from_json(data: dict[str, Any]) -> _RaiderSummary:
+        mplus = MythicPlusSummary(
+            score=str(data.get("score", "—")),
+            top_runs=tuple(_interned(r) for r in data.get("runs") or ()),
+        )
+        return mplus, tuple(_interned(r) for r in data.get("raids") or ())
+
+    @staticmethod
+    def _overview_to_json(overview: CharacterOverview) -> dict[str, Any]:
+        data = asdict(overview)
+        data["mythic_plus"] = CharacterService._summary_to_json((overview.mythic_plus, overview.raid_progress_lines))
+        del data["raid_progress_lines"]
+        return data
+
+    @staticmethod
+    def _overview_from_json(data: dict[str, Any]) -> CharacterOverview:
+        mythic_plus, raid_lines = CharacterService._summary_from_json(data["mythic_plus"])
+        strings = {k: sys.intern(v) if isinstance(v, str) else v for k, v in data.items() if k != "mythic_plus"}
+        return CharacterOverview(**strings, mythic_plus=mythic_plus, raid_progress_lines=raid_lines)
 
     @staticmethod
     def _extract_raid_progress(raider_payload: dict[str, Any]) -> list[str]:
@@ -163,7 +454,7 @@ class CharacterService:
             if not isinstance(data, dict):
                 continue
 
-            raid_name = data.get("name") or raid_slug.replace("-", " ").title()
+            raid_name = sys.intern(str(data.get("name") or raid_slug.replace("-", " ").title()))
 
             summary = data.get("summary")
             if isinstance(summary, str) and summary.strip():
@@ -218,8 +509,8 @@ class CharacterService:
 
             for r in cleaned[:3]:
                 lvl = r.get("keystone_level", "—")
-                dung = (r.get("dungeon") or {}).get("name") or "Dungeon"
+                dung = _interned((r.get("dungeon") or {}).get("name"), "Dungeon")
                 timed = "✅" if is_timed(r) else "⏱️"
                 top_runs.append(f"+{lvl} {timed} — {dung}")
 
-        return MythicPlusSummary(score=rating, top_runs=top_runs)
+        return MythicPlusSummary(score=rating, top_runs=tuple(top_runs))
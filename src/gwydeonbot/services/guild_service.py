@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import sys
+from collections.abc import AsyncIterator, Sequence
+from dataclasses import dataclass
+from typing import Any
+
+from ..clients.blizzard_api import BlizzardApiClient
+from ..domain.errors import WowApiError
+from ..domain.models import GuildMember, GuildMemberSummary, GuildRoster
+from ..utils.ratelimit import Priority, request_priority
+from ..utils.text import normalize_character_name
+from .character_service import CharacterService
+
+log = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class MemberResult:
+    member: GuildMember
+    summary: GuildMemberSummary | None  # None when this member failed
+    error: str | None = None
+
+
+class GuildService:
+    def __init__(
+        self,
+        blizzard: BlizzardApiClient,
+        characters: CharacterService,
+        *,
+        concurrency: int = 8,
+    ):
+        self._blizzard = blizzard
+        self._characters = characters
+        self._concurrency = concurrency
+
+    @property
+    def region(self) -> str:
+        return self._blizzard.region
+
+    async def get_roster(self, *, realm_slug: str, guild_slug: str) -> GuildRoster:
+        payload = await self._blizzard.guild_roster(realm_slug, guild_slug)
+        guild = payload.get("guild") or {}
+        members = [m for m in (self._parse_member(raw) for raw in payload.get("members") or []) if m]
+        members.sort(key=lambda m: (m.rank, -m.level, m.name))
+        return GuildRoster(
+            name=str(guild.get("name") or guild_slug),
+            realm=realm_slug,
+            members=tuple(members),
+        )
+
+    @staticmethod
+    def _parse_member(raw: Any) -> GuildMember | None:
+        if not isinstance(raw, dict):
+            return None
+        ch = raw.get("character") or {}
+        name = ch.get("name")
+        realm = (ch.get("realm") or {}).get("slug")
+        if not isinstance(name, str) or not isinstance(realm, str):
+            return None
+        level = ch.get("level")
+        class_id = (ch.get("playable_class") or {}).get("id")
+        rank = raw.get("rank")
+        return GuildMember(
+            name=normalize_character_name(name),
+            realm=sys.intern(realm),
+            level=level if isinstance(level, int) else 0,
+            class_id=class_id if isinstance(class_id, int) else None,
+            rank=rank if isinstance(rank, int) else 99,
+        )
+
+    async def iter_member_summaries(self, members: Sequence[GuildMember]) -> AsyncIterator[MemberResult]:
+        """Yield one result per member, in completion order.
+
+        At most ``concurrency`` members are in flight, at ``Priority.BATCH`` so
+        interactive commands overtake them at the limiters. A failing member
+        yields a result with ``error`` set instead of aborting the batch.
+        Closing the iterator early cancels the outstanding work.
+        """
+        todo: asyncio.Queue[GuildMember] = asyncio.Queue()
+        for m in members:
+            todo.put_nowait(m)
+        done: asyncio.Queue[MemberResult] = asyncio.Queue()
+
+        async def worker() -> None:
+            while True:
+                try:
+                    member = todo.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                try:
+                    summary = await self._characters.get_member_summary(member)
+                    done.put_nowait(MemberResult(member=member, summary=summary))
+                except WowApiError as e:
+                    done.put_nowait(MemberResult(member=member, summary=None, error=str(e) or type(e).__name__))
+                except Exception as e:  # never let one member kill the batch
+                    log.exception("Unexpected error summarizing %s-%s", member.name, member.realm)
+                    done.put_nowait(MemberResult(member=member, summary=None, error=type(e).__name__))
+
+        with request_priority(Priority.BATCH):
+            # Tasks copy the context they are created in
+            workers = [asyncio.create_task(worker()) for _ in range(min(self._concurrency, len(members)))]
+        try:
+            for _ in range(len(members)):
+                yield await done.get()
+        finally:
+            for w in workers:
+                w.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
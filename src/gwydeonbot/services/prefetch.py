@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import time
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import datetime
+
+from ..domain.errors import WowApiError, WowNotFound
+from ..utils.ratelimit import Priority, RateLimiter, request_priority
+from .character_service import CharacterService
+
+log = logging.getLogger(__name__)
+
+_CharKey = tuple[str, str]
+
+# Lookup counters kept for learning; the least looked-up half is dropped beyond this
+MAX_TRACKED = 20_000
+
+
+@dataclass
+class PrefetchStats:
+    refreshed: int = 0
+    fresh: int = 0  # still fresh enough, nothing fetched
+    failed: int = 0
+    deferred: int = 0  # postponed because interactive traffic was queued
+    sweeps: int = 0
+
+
+class PrefetchScheduler:
+    """Keep a watchlist of characters warm in ``CharacterService``'s caches.
+
+    The watchlist is the explicit entries plus the ``learn_top`` most looked-up
+    characters (lookup counts decay with ``learn_half_life``). Each sweep
+    refreshes every watched character whose cached overview is older than
+    ``refresh_after``, spaced evenly so that at most ``budget_per_minute``
+    refreshes run per minute. Refreshes run at ``Priority.BACKGROUND`` and
+    are deferred while interactive requests are queued on the Blizzard
+    limiter, so commands always go first.
+
+    With ``off_peak_hours=(start, end)`` (local hours, may wrap midnight)
+    sweeps only run inside that window.
+
+    In a cluster each worker learns from the lookups its own shards serve and
+    keeps those characters warm on its share of the budget.
+    With a shared cache a refresh is published to it, and a worker finding
+    one fresh enough there adopts it instead of fetching the character again.
+    """
+
+    def __init__(
+        self,
+        characters: CharacterService,
+        limiter: RateLimiter,
+        *,
+        watch: Iterable[tuple[str, str]] = (),
+        budget_per_minute: float = 60,
+        refresh_after: float = 480,
+        sweep_interval: float = 60,
+        learn_top: int = 200,
+        learn_min_lookups: float = 3,
+        learn_half_life: float = 3 * 24 * 3600,
+        off_peak_hours: tuple[int, int] | None = None,
+    ):
+        self._characters = characters
+        self._limiter = limiter
+        self._explicit: set[_CharKey] = set(watch)
+        self.budget_per_minute = budget_per_minute  # may be re-split while running
+        self._refresh_after = refresh_after
+        self._sweep_interval = sweep_interval
+        self._learn_top = learn_top
+        self._learn_min = learn_min_lookups
+        self._decay = math.log(2) / learn_half_life
+        self._off_peak = off_peak_hours
+        # key -> (decayed lookup count, when it was last updated)
+        self._lookups: dict[_CharKey, tuple[float, float]] = {}
+        self._task: asyncio.Task[None] | None = None
+        self.stats = PrefetchStats()
+        characters.on_lookup = self.record_lookup
+
+    # -----------------------------
+    # Watchlist
+    # -----------------------------
+    def watch(self, realm_slug: str, character_name: str) -> None:
+        self._explicit.add((realm_slug, character_name))
+
+    def unwatch(self, realm_slug: str, character_name: str) -> None:
+        self._explicit.discard((realm_slug, character_name))
+
+    def record_lookup(self, realm_slug: str, character_name: str) -> None:
+        key = (realm_slug, character_name)
+        now = time.monotonic()
+        count, at = self._lookups.get(key, (0.0, now))
+        self._lookups[key] = (count * math.exp(-self._decay * (now - at)) + 1, now)
+        if len(self._lookups) > MAX_TRACKED:
+            ranked = sorted(self._lookups, key=lambda k: self._score(k, now))
+            for k in ranked[: len(ranked) // 2]:
+                del self._lookups[k]
+
+    def _score(self, key: _CharKey, now: float) -> float:
+        count, at = self._lookups[key]
+        return count * math.exp(-self._decay * (now - at))
+
+    def learned(self) -> list[_CharKey]:
+        now = time.monotonic()
+        scored = []
+        for key in list(self._lookups):
+            score = self._score(key, now)
+            if score < 0.05:
+                del self._lookups[key]  # forgotten
+            elif score >= self._learn_min * 0.99:  # N lookups in a row decay to just under N
+                scored.append((score, key))
+        scored.sort(reverse=True)
+        return [key for _, key in scored[: self._learn_top]]
+
+    def watched(self) -> list[_CharKey]:
+        return sorted(self._explicit) + [k for k in self.learned() if k not in self._explicit]
+
+    # -----------------------------
+    # Scheduling
+    # -----------------------------
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name=f"prefetch-{self._characters.region}")
+
+    async def close(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def _in_window(self) -> bool:
+        if self._off_peak is None:
+            return True
+        start, end = self._off_peak
+        hour = datetime.now().hour
+        return start <= hour < end if start <= end else hour >= start or hour < end
+
+    async def _run(self) -> None:
+        while True:
+            started = time.monotonic()
+            if self._in_window():
+                try:
+                    await self.sweep()
+                except Exception:
+                    log.exception("Prefetch sweep failed")
+            await asyncio.sleep(max(0.0, self._sweep_interval - (time.monotonic() - started)))
+
+    async def sweep(self) -> None:
+        with request_priority(Priority.BACKGROUND):
+            await self._sweep()
+
+    async def _sweep(self) -> None:
+        self.stats.sweeps += 1
+        for realm_slug, character_name in self.watched():
+            spacing = 60 / self.budget_per_minute if self.budget_per_minute > 0 else 0.0
+            if not self._in_window():
+                return
+            if self._limiter.waiting(Priority.INTERACTIVE) > 0:
+                # Interactive work is waiting for quota: stay out of its way
+                self.stats.deferred += 1
+                while self._limiter.waiting(Priority.INTERACTIVE) > 0:
+                    await asyncio.sleep(max(spacing, 0.5))
+
+            try:
+                fetched = await self._characters.prefetch_overview(
+                    realm_slug=realm_slug,
+                    character_name=character_name,
+                    max_age=self._refresh_after,
+                )
+            except WowNotFound:
+                self.stats.failed += 1
+                self.unwatch(realm_slug, character_name)
+                self._lookups.pop((realm_slug, character_name), None)
+                continue
+            except WowApiError as e:
+                self.stats.failed += 1
+                log.debug("Prefetch of %s-%s failed: %s", character_name, realm_slug, e)
+                await asyncio.sleep(spacing)
+                continue
+            if fetched:
+                self.stats.refreshed += 1
+                await asyncio.sleep(spacing)
+            else:
+                self.stats.fresh += 1
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Callable
+
+log = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class RealmAlert:
+    guild_id: int
+    channel_id: int
+    region: str
+    realm_slug: str
+
+
+_Key = tuple[int, str, str]  # (guild id, region, realm slug)
+
+
+class RealmAlertStore:
+    """Channels subscribed to a realm's UP/DOWN transitions, one per guild and realm.
+
+    Kept in memory and persisted to a small JSON file. Each change re-reads
+    the file and rewrites it (off the event loop), so cluster workers sharing
+    the file don't drop each other's subscriptions; a worker only needs the
+    ones of its own guilds in memory, since those are the channels it can
+    reach.
+    """
+
+    def __init__(self, path: str | Path):
+        self._path = Path(path)
+        self._alerts: dict[_Key, RealmAlert] = {}
+        self._lock = asyncio.Lock()
+
+    async def load(self) -> None:
+        async with self._lock:
+            self._alerts = await asyncio.to_thread(self._read)
+
+    def channels_for(self, region: str, realm_slugs: set[str]) -> dict[int, list[str]]:
+        """channel id -> subscribed realm slugs among ``realm_slugs``."""
+        out: dict[int, list[str]] = {}
+        for a in self._alerts.values():
+            if a.region == region and a.realm_slug in realm_slugs:
+                out.setdefault(a.channel_id, []).append(a.realm_slug)
+        return out
+
+    def for_guild(self, guild_id: int) -> list[RealmAlert]:
+        return sorted((a for a in self._alerts.values() if a.guild_id == guild_id), key=lambda a: a.realm_slug)
+
+    async def subscribe(self, alert: RealmAlert) -> None:
+        def apply(alerts: dict[_Key, RealmAlert]) -> None:
+            alerts[(alert.guild_id, alert.region, alert.realm_slug)] = alert
+
+        await self._update(apply)
+
+    async def unsubscribe(self, guild_id: int, region: str, realm_slug: str) -> bool:
+        removed = False
+
+        def apply(alerts: dict[_Key, RealmAlert]) -> None:
+            nonlocal removed
+            removed = alerts.pop((guild_id, region, realm_slug), None) is not None
+
+        await self._update(apply)
+        return removed
+
+    async def _update(self, apply: Callable[[dict[_Key, RealmAlert]], None]) -> None:
+        def work() -> dict[_Key, RealmAlert]:
+            alerts = self._read()
+            apply(alerts)
+            self._write(alerts)
+            return alerts
+
+        async with self._lock:
+            self._alerts = await asyncio.to_thread(work)
+
+    def _read(self) -> dict[_Key, RealmAlert]:
+        try:
+            raw = json.loads(self._path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            log.warning("Unreadable realm alerts file %s: %s", self._path, e)
+            return {}
+        alerts: dict[_Key, RealmAlert] = {}
+        for item in raw.get("alerts") or []:
+            try:
+                a = RealmAlert(int(item["guild_id"]), int(item["channel_id"]), item["region"], item["realm_slug"])
+            except (KeyError, TypeError, ValueError):
+                continue
+            alerts[(a.guild_id, a.region, a.realm_slug)] = a
+        return alerts
+
+    def _write(self, alerts: dict[_Key, RealmAlert]) -> None:
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self._path.with_name(f"{self._path.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps({"alerts": [asdict(a) for a in alerts.values()]}, indent=1), encoding="utf-8")
+        os.replace(tmp, self._path)
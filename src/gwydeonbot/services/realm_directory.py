@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any
+
+from ..clients.blizzard_api import BlizzardApiClient
+from ..domain.errors import WowApiError
+from ..utils.aio import gather_or_cancel
+from ..utils.ratelimit import Priority, request_priority
+from ..utils.search import SearchIndex
+from ..utils.text import normalize_realm_slug
+
+log = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class RealmEntry:
+    id: int
+    slug: str
+    name: str
+
+
+class RealmDirectory:
+    """In-memory realm index: slug/name -> realm id -> connected-realm id.
+
+    Built from ``/data/wow/realm/index`` and refreshed periodically. Each
+    refresh also pages through the connected-realm search, which lists the
+    member realms of every group, so resolving a realm's connected-realm id
+    needs no call. Realms missing from it (new, or the search failed) are
+    looked up through their realm payload on first use.
+    """
+
+    def __init__(self, blizzard: BlizzardApiClient, *, refresh_seconds: float = 6 * 3600):
+        self._blizzard = blizzard
+        self._refresh_seconds = refresh_seconds
+        self._by_key: dict[str, RealmEntry] = {}
+        self._by_id: dict[int, RealmEntry] = {}
+        self._connected: dict[int, int] = {}  # realm id -> connected-realm id
+        self._search: SearchIndex[RealmEntry] = SearchIndex(())
+        self._loaded_at: float | None = None
+        self._load_lock = asyncio.Lock()
+        self._refresh_task: asyncio.Task[None] | None = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded_at is not None
+
+    def realms(self) -> list[RealmEntry]:
+        return list(self._by_id.values())
+
+    def by_id(self, realm_id: int) -> RealmEntry | None:
+        return self._by_id.get(realm_id)
+
+    async def resolve(self, realm: str) -> RealmEntry | None:
+        """Find a realm by slug or by any spelling that normalizes to it."""
+        if not self.loaded:
+            async with self._load_lock:
+                # Concurrent first lookups share a single load
+                if not self.loaded:
+                    await self.refresh()
+        return self.lookup(realm)
+
+    def lookup(self, realm: str) -> RealmEntry | None:
+        """Like ``resolve`` but never loads: None until the index is in memory."""
+        return self._by_key.get(normalize_realm_slug(realm))
+
+    def suggest(self, query: str, limit: int = 25) -> list[RealmEntry]:
+        """Realms matching a partial or misspelled name, for autocomplete."""
+        return self._search.search(normalize_realm_slug(query), limit)
+
+    def members(self, cr_id: int) -> list[RealmEntry]:
+        """Known realms of a connected realm (as learned so far)."""
+        return [e for rid, c in self._connected.items() if c == cr_id and (e := self._by_id.get(rid))]
+
+    async def connected_realm_id(self, realm: RealmEntry) -> int | None:
+        cr_id = self._connected.get(realm.id)
+        if cr_id is not None:
+            return cr_id
+
+        realm_data = await self._blizzard.realm_by_id(realm.id)
+        cr_href = (realm_data.get("connected_realm") or {}).get("href")
+        cr_id = BlizzardApiClient.extract_id_from_href(cr_href) if cr_href else None
+        if cr_id:
+            self._connected[realm.id] = cr_id
+        return cr_id
+
+    def learn_connected_realm(self, cr_id: int, payload: dict[str, Any]) -> None:
+        """Record every member realm listed in a connected-realm payload."""
+        for r in payload.get("realms") or []:
+            if isinstance(r, dict) and isinstance(r.get("id"), int):
+                self._connected[r["id"]] = cr_id
+
+    async def refresh(self) -> None:
+        idx, _ = await gather_or_cancel(self._blizzard.realm_index(), self._load_connected())
+        self._by_key = self._build(idx)
+        self._by_id = {e.id: e for e in self._by_key.values()}
+        self._search = SearchIndex(self._by_key.items())
+        self._loaded_at = time.monotonic()
+
+    async def _load_connected(self) -> None:
+        try:
+            page, page_count = 1, 1
+            while page <= page_count:
+                data = await self._blizzard.connected_realm_search(page)
+                page_count = int(data.get("pageCount") or 1)
+                for result in data.get("results") or []:
+                    cr = result.get("data") if isinstance(result, dict) else None
+                    if isinstance(cr, dict) and isinstance(cr.get("id"), int):
+                        self.learn_connected_realm(cr["id"], cr)
+                page += 1
+        except WowApiError as e:
+            # Not fatal: connected_realm_id falls back to the realm payload
+            log.warning("Connected-realm search failed: %s", e)
+
+    @staticmethod
+    def _build(idx: dict[str, Any]) -> dict[str, RealmEntry]:
+        by_key: dict[str, RealmEntry] = {}
+        for r in idx.get("realms") or []:
+            if not isinstance(r, dict):
+                continue
+            realm_id, slug = r.get("id"), r.get("slug")
+            if not isinstance(realm_id, int) or not isinstance(slug, str):
+                continue
+            name = r.get("name")
+            entry = RealmEntry(id=realm_id, slug=slug, name=str(name) if isinstance(name, str) else slug)
+            by_key[slug] = entry
+            by_key.setdefault(normalize_realm_slug(entry.name), entry)
+        return by_key
+
+    # -----------------------------
+    # Periodic refresh
+    # -----------------------------
+    def start(self) -> None:
+        if self._refresh_task is None or self._refresh_task.done():
+            with request_priority(Priority.BACKGROUND):
+                self._refresh_task = asyncio.create_task(self._refresh_loop(), name="realm-directory-refresh")
+
+    async def close(self) -> None:
+        if self._refresh_task:
+            self._refresh_task.cancel()
+            try:
+                await self._refresh_task
+            except asyncio.CancelledError:
+                pass
+            self._refresh_task = None
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            try:
+                await self.refresh()
+            except WowApiError as e:
+                log.warning("Realm directory refresh failed: %s", e)
+            except Exception:
+                # An odd payload must not end the refresh task for good
+                log.exception("Realm directory refresh failed")
+            await asyncio.sleep(self._refresh_seconds)
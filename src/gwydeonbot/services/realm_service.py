@@ -2,40 +2,60 @@ from __future__ import annotations
 
 from ..clients.blizzard_api import BlizzardApiClient
 from ..domain.errors import WowNotFound
+from ..utils.cache import CacheStats, TTLCache
+from .realm_directory import RealmDirectory
+from .realm_status import RealmStatusPoller
 
 
 class RealmService:
-    def __init__(self, blizzard: BlizzardApiClient):
+    def __init__(
+        self,
+        blizzard: BlizzardApiClient,
+        *,
+        status_ttl_seconds: float = 30,
+        status_poll_seconds: float = 60,
+    ):
         self._blizzard = blizzard
+        self.directory = RealmDirectory(blizzard)
+        # Whole-region snapshot; the per-realm path below is only a fallback
+        # while it is missing or stale (or polling is disabled)
+        self.status = RealmStatusPoller(blizzard, self.directory, interval=status_poll_seconds)
+        # connected-realm id -> status type ("UP" / "DOWN" / "")
+        self._status_cache: TTLCache[int, str] = TTLCache(status_ttl_seconds, max_entries=1_000)
 
     @property
     def region(self) -> str:
         return self._blizzard.region
 
-    async def get_realm_status_text(self, *, realm_slug: str) -> str:
-        idx = await self._blizzard.realm_index()
-        realms = idx.get("realms") or []
+    def cache_stats(self) -> dict[str, CacheStats]:
+        return {"realm_status": self._status_cache.stats}
 
-        realm = next((r for r in realms if isinstance(r, dict) and r.get("slug") == realm_slug), None)
-        if not realm:
-            raise WowNotFound()
+    def start(self) -> None:
+        self.directory.start()
+        self.status.start()
 
-        realm_id = realm.get("id")
-        if not realm_id:
-            raise WowNotFound()
+    async def close(self) -> None:
+        await self.status.close()
+        await self.directory.close()
 
-        realm_data = await self._blizzard.realm_by_id(int(realm_id))
-        cr_href = ((realm_data.get("connected_realm") or {}).get("href"))
-        if not cr_href:
-            return "Desconocido"
+    async def get_realm_status_text(self, *, realm_slug: str) -> str:
+        realm = await self.directory.resolve(realm_slug)
+        if not realm:
+            raise WowNotFound()
 
-        cr_id = BlizzardApiClient.extract_id_from_href(cr_href)
+        cr_id = await self.directory.connected_realm_id(realm)
         if not cr_id:
             return "Desconocido"
 
-        cr = await self._blizzard.connected_realm(cr_id)
-        status_obj = cr.get("status") or {}
-        status_type = status_obj.get("type")  # UP / DOWN
+        status_type = self.status.status_of(cr_id)
+        if status_type is None:
+            status_type = self._status_cache.get(cr_id)
+        if status_type is None:
+            cr = await self._blizzard.connected_realm(cr_id)
+            self.directory.learn_connected_realm(cr_id, cr)
+            status_obj = cr.get("status") or {}
+            status_type = str(status_obj.get("type") or "")  # UP / DOWN
+            self._status_cache.set(cr_id, status_type)
 
         mapping = {"UP": "Online ✅", "DOWN": "Offline ❌"}
-        return mapping.get(status_type, str(status_type or "Desconocido"))
+        return mapping.get(status_type, status_type or "Desconocido")
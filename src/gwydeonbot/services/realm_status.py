@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable
+
+from ..clients.blizzard_api import BlizzardApiClient
+from ..domain.errors import WowApiError
+from ..utils.ratelimit import Priority, request_priority
+from .realm_directory import RealmDirectory
+
+log = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class RealmStatusChange:
+    region: str
+    connected_realm_id: int
+    old: str  # "UP" / "DOWN" / ...
+    new: str
+
+
+@dataclass
+class RealmStatusStats:
+    polls: int = 0
+    failures: int = 0
+    changes: int = 0
+
+
+StatusListener = Callable[[RealmStatusChange], Awaitable[None]]
+
+
+class RealmStatusPoller:
+    """Region-wide realm status snapshot, refreshed in one sweep.
+
+    Every ``interval`` seconds the connected-realm search is paged through
+    (usually a single page), giving the status of every connected realm
+    keyed by its id; realms in one group share an entry. The member realms
+    listed there are fed to the ``RealmDirectory``, so resolving a realm's
+    connected-realm id needs no call either.
+
+    Transitions between sweeps are pushed to the listeners. The first sweep
+    only sets the baseline.
+    """
+
+    def __init__(self, blizzard: BlizzardApiClient, directory: RealmDirectory, *, interval: float = 60):
+        self._blizzard = blizzard
+        self._directory = directory
+        self._interval = interval
+        self._snapshot: dict[int, str] = {}
+        self._updated_at: float | None = None
+        self._listeners: list[StatusListener] = []
+        self._notify_tasks: set[asyncio.Task[Any]] = set()
+        self._task: asyncio.Task[None] | None = None
+        self.stats = RealmStatusStats()
+
+    def add_listener(self, listener: StatusListener) -> None:
+        self._listeners.append(listener)
+
+    @property
+    def age(self) -> float | None:
+        """Seconds since the last successful sweep."""
+        return None if self._updated_at is None else time.monotonic() - self._updated_at
+
+    def status_of(self, cr_id: int) -> str | None:
+        """Status from the snapshot; None if unknown or the snapshot went stale."""
+        age = self.age
+        if age is None or age > 3 * self._interval:
+            return None
+        return self._snapshot.get(cr_id)
+
+    # -----------------------------
+    # Polling
+    # -----------------------------
+    def start(self) -> None:
+        if self._interval > 0 and (self._task is None or self._task.done()):
+            with request_priority(Priority.BACKGROUND):
+                self._task = asyncio.create_task(self._run(), name=f"realm-status-{self._blizzard.region}")
+
+    async def close(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            started = time.monotonic()
+            try:
+                await self.poll()
+            except WowApiError as e:
+                self.stats.failures += 1
+                log.warning("Realm status poll (%s) failed: %s", self._blizzard.region, e)
+            except Exception:
+                # A bug or odd payload must not stop the poller for good
+                self.stats.failures += 1
+                log.exception("Realm status poll (%s) failed", self._blizzard.region)
+            await asyncio.sleep(max(0.0, self._interval - (time.monotonic() - started)))
+
+    async def poll(self) -> list[RealmStatusChange]:
+        snapshot: dict[int, str] = {}
+        page, page_count = 1, 1
+        while page <= page_count:
+            data = await self._blizzard.connected_realm_search(page)
+            page_count = int(data.get("pageCount") or 1)
+            for result in data.get("results") or []:
+                cr = result.get("data") if isinstance(result, dict) else None
+                if not isinstance(cr, dict) or not isinstance(cr.get("id"), int):
+                    continue
+                snapshot[cr["id"]] = str((cr.get("status") or {}).get("type") or "")
+                self._directory.learn_connected_realm(cr["id"], cr)
+            page += 1
+
+        changes: list[RealmStatusChange] = []
+        if self._updated_at is not None:
+            for cr_id, new in snapshot.items():
+                old = self._snapshot.get(cr_id)
+                if old is not None and old != new:
+                    changes.append(RealmStatusChange(self._blizzard.region, cr_id, old, new))
+
+        self._snapshot = snapshot
+        self._updated_at = time.monotonic()
+        self.stats.polls += 1
+        self.stats.changes += len(changes)
+        for change in changes:
+            for listener in self._listeners:
+                # Slow notifications must not hold up the next sweep
+                task = asyncio.create_task(self._notify(listener, change))
+                self._notify_tasks.add(task)
+                task.add_done_callback(self._notify_tasks.discard)
+        return changes
+
+    @staticmethod
+    async def _notify(listener: StatusListener, change: RealmStatusChange) -> None:
+        try:
+            await listener(change)
+        except Exception:
+            log.exception("Realm status listener failed for %s", change)
@@ -0,0 +1,235 @@
+from __future__ import annotations
+
+from collections.abc import Iterator
+from dataclasses import dataclass
+
+from ..clients.blizzard_api import BlizzardApiClient
+from ..clients.blizzard_oauth import BlizzardOAuthClient
+from ..clients.raiderio_api import RaiderIoClient
+from ..clients.transport import HttpTransport
+from ..config import SUPPORTED_REGIONS
+from ..metrics import MetricFamily
+from ..utils.cache_backend import TieredCache
+from ..utils.ratelimit import RateLimiter
+from .character_service import CharacterService
+from .guild_service import GuildService
+from .prefetch import PrefetchScheduler
+from .realm_service import RealmService
+from .realm_status import StatusListener
+
+# Locale used for regions other than the configured default one
+REGION_LOCALES = {"eu": "es_ES", "us": "es_MX", "kr": "ko_KR", "tw": "zh_TW"}
+
+
+@dataclass
+class RegionServices:
+    region: str
+    blizzard: BlizzardApiClient
+    raiderio: RaiderIoClient
+    characters: CharacterService
+    realms: RealmService
+    guilds: GuildService
+    prefetch: PrefetchScheduler
+
+
+class ServiceRegistry:
+    """Per-region clients and services for a single bot process.
+
+    Regions are built lazily on first use. They share the HTTP pools, the
+    OAuth token (Battle.net tokens work for every non-CN region), the
+    Blizzard quota and the shared cache tier, and split the prefetch budget
+    among them. Local caches and circuit breakers stay per region.
+    """
+
+    def __init__(
+        self,
+        *,
+        transport: HttpTransport,
+        oauth: BlizzardOAuthClient,
+        default_region: str,
+        default_locale: str,
+        regions: tuple[str, ...] = SUPPORTED_REGIONS,
+        blizzard_limiter: RateLimiter | None = None,
+        raiderio_limiter: RateLimiter | None = None,
+        shared_cache: TieredCache | None = None,
+        not_found_ttl: float = 60,
+        not_found_max_entries: int = 10_000,
+        prefetch_watchlist: tuple[tuple[str, str, str], ...] = (),
+        prefetch_budget_per_minute: float = 60,
+        prefetch_off_peak_hours: tuple[int, int] | None = None,
+        realm_status_poll_seconds: float = 60,
+    ):
+        self._transport = transport
+        self._oauth = oauth
+        self.default_region = default_region.lower()
+        self._default_locale = default_locale
+        self.regions = tuple(r.lower() for r in regions)
+        unsupported = [r for r in (self.default_region, *self.regions) if r not in SUPPORTED_REGIONS]
+        if unsupported:
+            raise ValueError(f"Regiones no soportadas: {', '.join(unsupported)}")
+        self._blizzard_limiter = blizzard_limiter or RateLimiter.blizzard()
+        self._raiderio_limiter = raiderio_limiter or RateLimiter.per_minute("raiderio", 200)
+        self._shared = shared_cache
+        self._not_found_ttl = not_found_ttl
+        self._not_found_max_entries = not_found_max_entries
+        # (region, realm slug, character name) entries to keep warm
+        self._prefetch_watchlist = prefetch_watchlist
+        self._prefetch_budget = prefetch_budget_per_minute
+        self._prefetch_off_peak = prefetch_off_peak_hours
+        self._realm_status_poll = realm_status_poll_seconds
+        self._status_listeners: list[StatusListener] = []
+        self._built: dict[str, RegionServices] = {}
+
+    def get(self, region: str | None = None) -> RegionServices:
+        region = (region or self.default_region).lower()
+        svc = self._built.get(region)
+        if svc is None:
+            if region not in self.regions:
+                raise ValueError(f"Región no soportada: {region}")
+            svc = self._built[region] = self._build(region)
+            # One Blizzard quota: the regions in use split the prefetch budget
+            for built in self._built.values():
+                built.prefetch.budget_per_minute = self._prefetch_budget / len(self._built)
+        return svc
+
+    def active(self) -> list[RegionServices]:
+        return list(self._built.values())
+
+    def add_realm_status_listener(self, listener: StatusListener) -> None:
+        """Subscribe to realm UP/DOWN transitions of every region, built or not."""
+        self._status_listeners.append(listener)
+        for svc in self._built.values():
+            svc.realms.status.add_listener(listener)
+
+    def _build(self, region: str) -> RegionServices:
+        locale = self._default_locale if region == self.default_region else REGION_LOCALES[region]
+        blizzard = BlizzardApiClient(
+            self._transport.session("blizzard"),
+            self._oauth,
+            region=region,
+            locale=locale,
+            shared_cache=self._shared,
+            limiter=self._blizzard_limiter,
+            timeout=self._transport.timeout,
+            not_found_ttl=self._not_found_ttl,
+            not_found_max_entries=self._not_found_max_entries,
+        )
+        raiderio = RaiderIoClient(
+            self._transport.session("raiderio"),
+            region=region,
+            limiter=self._raiderio_limiter,
+            timeout=self._transport.timeout,
+            not_found_ttl=self._not_found_ttl,
+            not_found_max_entries=self._not_found_max_entries,
+        )
+        characters = CharacterService(blizzard, raiderio, shared_cache=self._shared)
+        realms = RealmService(blizzard, status_poll_seconds=self._realm_status_poll)
+        for listener in self._status_listeners:
+            realms.status.add_listener(listener)
+        realms.start()
+        prefetch = PrefetchScheduler(
+            characters,
+            self._blizzard_limiter,
+            watch=[(realm, name) for r, realm, name in self._prefetch_watchlist if r == region],
+            budget_per_minute=self._prefetch_budget,
+            off_peak_hours=self._prefetch_off_peak,
+        )
+        if self._prefetch_budget > 0:
+            prefetch.start()
+        return RegionServices(
+            region=region,
+            blizzard=blizzard,
+            raiderio=raiderio,
+            characters=characters,
+            realms=realms,
+            guilds=GuildService(blizzard, characters),
+            prefetch=prefetch,
+        )
+
+    def collect_metrics(self) -> Iterator[MetricFamily]:
+        """Scrape-time view of cache, coalescing, limiter and breaker stats."""
+        lookups = MetricFamily("gwydeonbot_cache_lookups_total", "counter", "Cache lookups by result.")
+        evictions = MetricFamily("gwydeonbot_cache_evictions_total", "counter", "Cache entries dropped.")
+        coalesced = MetricFamily("gwydeonbot_coalesced_requests_total", "counter", "GETs by single-flight outcome.")
+        breaker_opens = MetricFamily("gwydeonbot_circuit_opens_total", "counter", "Circuit breaker openings.")
+        short_circuited = MetricFamily(
+            "gwydeonbot_circuit_short_circuited_total", "counter", "Calls rejected by an open circuit."
+        )
+        prefetches = MetricFamily("gwydeonbot_prefetch_total", "counter", "Watchlist prefetches by outcome.")
+        prefetch_hits = MetricFamily(
+            "gwydeonbot_prefetch_hits_total", "counter", "Overview lookups served from a prefetched entry."
+        )
+        watched = MetricFamily("gwydeonbot_prefetch_watched", "gauge", "Characters on the prefetch watchlist.")
+        status_polls = MetricFamily("gwydeonbot_realm_status_polls_total", "counter", "Realm status sweeps by result.")
+        status_changes = MetricFamily(
+            "gwydeonbot_realm_status_changes_total", "counter", "Connected-realm UP/DOWN transitions seen."
+        )
+
+        for svc in self._built.values():
+            caches = {
+                **svc.blizzard.cache_stats(),
+                **svc.raiderio.cache_stats(),
+                **svc.characters.cache_stats(),
+                **svc.realms.cache_stats(),
+            }
+            for name, st in caches.items():
+                lookups.add(st.hits, region=svc.region, cache=name, result="hit")
+                lookups.add(st.misses, region=svc.region, cache=name, result="miss")
+                evictions.add(st.evictions, region=svc.region, cache=name, reason="capacity")
+                evictions.add(st.expirations, region=svc.region, cache=name, reason="expired")
+            for upstream, sf in (("blizzard", svc.blizzard.coalesce_stats), ("raiderio", svc.raiderio.coalesce_stats)):
+                coalesced.add(sf.hits, region=svc.region, upstream=upstream, result="joined")
+                coalesced.add(sf.misses, region=svc.region, upstream=upstream, result="started")
+            for client in (svc.blizzard, svc.raiderio):
+                for b in client.resilience.breakers.values():
+                    breaker_opens.add(b.opens, region=svc.region, breaker=b.name)
+                    short_circuited.add(b.short_circuited, region=svc.region, breaker=b.name)
+            pst = svc.prefetch.stats
+            for result in ("refreshed", "fresh", "failed", "deferred"):
+                prefetches.add(getattr(pst, result), region=svc.region, result=result)
+            prefetch_hits.add(svc.characters.prefetch_hits, region=svc.region)
+            watched.add(len(svc.prefetch.watched()), region=svc.region)
+            rst = svc.realms.status.stats
+            status_polls.add(rst.polls, region=svc.region, result="ok")
+            status_polls.add(rst.failures, region=svc.region, result="error")
+            status_changes.add(rst.changes, region=svc.region)
+
+        # Limiters are shared across regions
+        queue = MetricFamily("gwydeonbot_ratelimit_queue_depth", "gauge", "Requests waiting for local quota.")
+        waits = MetricFamily("gwydeonbot_ratelimit_wait_seconds_total", "counter", "Time spent waiting for quota.")
+        outcomes = MetricFamily("gwydeonbot_ratelimit_requests_total", "counter", "Quota acquisitions by outcome.")
+        in_flight = MetricFamily("gwydeonbot_ratelimit_in_flight", "gauge", "Upstream requests holding a slot.")
+        for limiter in (self._blizzard_limiter, self._raiderio_limiter):
+            for priority, st in limiter.class_stats.items():
+                labels = {"limiter": limiter.name, "priority": priority.name.lower()}
+                queue.add(limiter.waiting(priority), **labels)
+                in_flight.add(limiter.in_flight(priority), **labels)
+                waits.add(st.total_wait, **labels)
+                outcomes.add(st.acquired - st.waited, outcome="immediate", **labels)
+                outcomes.add(st.waited, outcome="waited", **labels)
+                outcomes.add(st.rejected, outcome="rejected", **labels)
+
+        # So is the shared cache tier
+        batches = MetricFamily(
+            "gwydeonbot_shared_cache_batches_total", "counter", "Round-trips to the shared cache backend."
+        )
+        if self._shared is not None:
+            l1, st = self._shared.l1_stats, self._shared.stats
+            lookups.add(l1.hits, region="all", cache="shared_l1", result="hit")
+            lookups.add(l1.misses, region="all", cache="shared_l1", result="miss")
+            lookups.add(st.l2_hits, region="all", cache="shared_l2", result="hit")
+            lookups.add(st.l2_misses, region="all", cache="shared_l2", result="miss")
+            evictions.add(l1.evictions, region="all", cache="shared_l1", reason="capacity")
+            evictions.add(l1.expirations, region="all", cache="shared_l1", reason="expired")
+            batches.add(st.l2_batches, backend=self._shared.backend.name, op="get")
+            batches.add(st.write_batches, backend=self._shared.backend.name, op="set")
+
+        yield from (lookups, evictions, coalesced, breaker_opens, short_circuited, prefetches, prefetch_hits, watched)
+        yield from (status_polls, status_changes, queue, in_flight, waits, outcomes, batches)
+
+    async def close(self) -> None:
+        for svc in self._built.values():
+            await svc.prefetch.close()
+            await svc.characters.close()
+            await svc.realms.close()
+        self._built.clear()
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import time
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+from .metrics import MetricFamily
+
+log = logging.getLogger(__name__)
+
+
+class StartupTimer:
+    """Wall-clock phases of one boot, from process start to ready.
+
+    Each ``mark(phase)`` closes the phase that ran since the previous mark.
+    Work moved off the critical path is ``record``ed with its own duration
+    and does not count towards ``total``.
+    """
+
+    def __init__(self, started_at: float | None = None):
+        self._started = time.perf_counter() if started_at is None else started_at
+        self._last = self._started
+        self.phases: list[tuple[str, float]] = []
+        self.done = False
+
+    def mark(self, phase: str) -> float:
+        now = time.perf_counter()
+        elapsed, self._last = now - self._last, now
+        self.phases.append((phase, elapsed))
+        return elapsed
+
+    def record(self, phase: str, elapsed: float) -> None:
+        self.phases.append((phase, elapsed))
+
+    @property
+    def total(self) -> float:
+        return self._last - self._started
+
+    def report(self) -> str:
+        parts = " · ".join(f"{name} {secs * 1000:.0f}ms" for name, secs in self.phases)
+        return f"Startup took {self.total:.2f}s: {parts}"
+
+    def collect_metrics(self) -> Iterator[MetricFamily]:
+        fam = MetricFamily("gwydeonbot_startup_seconds", "gauge", "Duration of each boot phase.")
+        for name, secs in self.phases:
+            fam.add(secs, phase=name)
+        yield fam
+
+
+# -----------------------------
+# Command tree sync
+# -----------------------------
+def command_tree_fingerprint(payload: list[dict[str, Any]]) -> str:
+    """Stable hash of the command payloads that ``tree.sync()`` would upload."""
+    blob = json.dumps(sorted(payload, key=lambda c: (c.get("type", 1), c.get("name", ""))), sort_keys=True)
+    return hashlib.sha256(blob.encode()).hexdigest()
+
+
+class CommandSyncState:
+    """Fingerprint of the last command tree synced, per application and scope.
+
+    Stored in a small JSON file so a restart with an unchanged tree can skip
+    the (rate-limited) sync call. Delete the file to force a sync.
+    """
+
+    def __init__(self, path: str | Path):
+        self._path = Path(path)
+
+    def _read(self) -> dict[str, str]:
+        try:
+            data = json.loads(self._path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            log.warning("Unreadable command sync state %s: %s", self._path, e)
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def get(self, scope: str) -> str | None:
+        return self._read().get(scope)
+
+    def set(self, scope: str, fingerprint: str) -> None:
+        data = self._read()
+        data[scope] = fingerprint
+        try:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self._path.with_name(f"{self._path.name}.{os.getpid()}.tmp")
+            tmp.write_text(json.dumps(data, indent=1, sort_keys=True), encoding="utf-8")
+            os.replace(tmp, self._path)
+        except OSError as e:
+            log.warning("Could not save command sync state %s: %s", self._path, e)
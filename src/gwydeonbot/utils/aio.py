@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Awaitable
+
+
+async def gather_or_cancel(*aws: Awaitable[Any]) -> list[Any]:
+    """Run awaitables concurrently; on the first failure cancel the rest.
+
+    Like ``asyncio.gather`` but with structured cancellation: siblings never
+    outlive the call, whether it fails or the caller itself is cancelled.
+    """
+    tasks = [asyncio.ensure_future(aw) for aw in aws]
+    try:
+        done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+        for t in done:
+            if not t.cancelled() and t.exception() is not None:
+                raise t.exception()  # type: ignore[misc]
+        return [t.result() for t in tasks]
+    finally:
+        pending = [t for t in tasks if not t.done()]
+        for t in pending:
+            t.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
@@ -1,10 +1,14 @@
 from __future__ import annotations
 
+import heapq
+import sys
 import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
 from dataclasses import dataclass
-from typing import Generic, TypeVar
+from typing import Any, Generic, TypeVar
 
-K = TypeVar("K")
+K = TypeVar("K", bound=Hashable)
 V = TypeVar("V")
 
 
@@ -12,31 +16,169 @@ V = TypeVar("V")
 class _Entry(Generic[V]):
     expires_at: float
     value: V
+    size: int
+    seq: int
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0  # dropped to respect max_entries / max_bytes
+    expirations: int = 0  # dropped because their TTL ran out
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+def approx_size(obj: Any, _depth: int = 0) -> int:
+    """Rough deep ``sys.getsizeof`` for JSON-like values (dict/list/tuple/str)."""
+    size = sys.getsizeof(obj)
+    if _depth >= 6:
+        return size
+    if isinstance(obj, dict):
+        for k, v in obj.items():
+            size += approx_size(k, _depth + 1) + approx_size(v, _depth + 1)
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        for v in obj:
+            size += approx_size(v, _depth + 1)
+    elif hasattr(obj, "__slots__") or hasattr(obj, "__dict__"):
+        for name in getattr(obj, "__slots__", ()) or vars(obj):
+            size += approx_size(getattr(obj, name, None), _depth + 1)
+    return size
 
 
 class TTLCache(Generic[K, V]):
-    """Tiny in-memory TTL cache.
+    """Bounded in-memory LRU cache with per-entry TTL.
+
+    All operations are O(1) except expiry bookkeeping, which is a heap push
+    on ``set``. Expired entries are swept a few at a time on every call, so
+    keys nobody reads again still get dropped. Uses a monotonic clock.
 
     Good enough for a single-process bot. If you scale horizontally, swap this
     for Redis or similar.
     """
 
-    def __init__(self, ttl_seconds: float):
+    SWEEP_BATCH = 16
+
+    def __init__(
+        self,
+        ttl_seconds: float,
+        *,
+        max_entries: int = 10_000,
+        max_bytes: int | None = None,
+        sizeof: Callable[[V], int] | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
         self._ttl = float(ttl_seconds)
-        self._store: dict[K, _Entry[V]] = {}
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        # Sizing is only paid for when there is a byte budget to enforce
+        self._sizeof = sizeof or (approx_size if max_bytes is not None else None)
+        self._clock = clock
+        self._store: OrderedDict[K, _Entry[V]] = OrderedDict()
+        self._expiry: list[tuple[float, int, K]] = []
+        self._seq = 0
+        self._bytes = 0
+        self.stats = CacheStats()
+
+    def __len__(self) -> int:
+        return len(self._store)
+
+    def __contains__(self, key: object) -> bool:
+        entry = self._store.get(key)  # type: ignore[call-overload]
+        return entry is not None and entry.expires_at > self._clock()
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
 
     def get(self, key: K) -> V | None:
-        now = time.time()
+        now = self._clock()
+        self._sweep(now, self.SWEEP_BATCH)
         entry = self._store.get(key)
-        if not entry:
+        if entry is None:
+            self.stats.misses += 1
             return None
         if entry.expires_at <= now:
-            self._store.pop(key, None)
+            self._drop(key)
+            self.stats.expirations += 1
+            self.stats.misses += 1
             return None
+        self._store.move_to_end(key)
+        self.stats.hits += 1
         return entry.value
 
-    def set(self, key: K, value: V) -> None:
-        self._store[key] = _Entry(expires_at=time.time() + self._ttl, value=value)
+    def peek(self, key: K) -> V | None:
+        """Like ``get`` but without touching stats or LRU order."""
+        entry = self._store.get(key)
+        if entry is None or entry.expires_at <= self._clock():
+            return None
+        return entry.value
+
+    def set(self, key: K, value: V, ttl: float | None = None) -> None:
+        now = self._clock()
+        self._sweep(now, self.SWEEP_BATCH)
+
+        ttl = self._ttl if ttl is None else float(ttl)
+        if ttl <= 0:
+            self.delete(key)
+            return
+
+        size = self._sizeof(value) if self._sizeof else 0
+        if self._max_bytes is not None and size > self._max_bytes:
+            # Would evict everything else and still not fit
+            self.delete(key)
+            return
+
+        if key in self._store:
+            self._drop(key)
+
+        self._seq += 1
+        entry = _Entry(expires_at=now + ttl, value=value, size=size, seq=self._seq)
+        self._store[key] = entry
+        self._bytes += size
+        heapq.heappush(self._expiry, (entry.expires_at, entry.seq, key))
+
+        while len(self._store) > self._max_entries or (
+            self._max_bytes is not None and self._bytes > self._max_bytes
+        ):
+            oldest = next(iter(self._store))
+            self._drop(oldest)
+            self.stats.evictions += 1
+
+        # Stale heap records pile up on overwrites/evictions; rebuild occasionally
+        if len(self._expiry) > 2 * len(self._store) + 64:
+            self._expiry = [(e.expires_at, e.seq, k) for k, e in self._store.items()]
+            heapq.heapify(self._expiry)
+
+    def delete(self, key: K) -> None:
+        if key in self._store:
+            self._drop(key)
 
     def clear(self) -> None:
         self._store.clear()
+        self._expiry.clear()
+        self._bytes = 0
+
+    def sweep(self) -> int:
+        """Drop every expired entry now. Returns how many were removed."""
+        return self._sweep(self._clock(), None)
+
+    def _sweep(self, now: float, limit: int | None) -> int:
+        removed = 0
+        heap = self._expiry
+        while heap and heap[0][0] <= now and (limit is None or removed < limit):
+            _, seq, key = heapq.heappop(heap)
+            entry = self._store.get(key)
+            if entry is not None and entry.seq == seq:
+                self._drop(key)
+                self.stats.expirations += 1
+                removed += 1
+        return removed
+
+    def _drop(self, key: K) -> None:
+        entry = self._store.pop(key)
+        self._bytes -= entry.size
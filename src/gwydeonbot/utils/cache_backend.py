@@ -0,0 +1,262 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import zlib
+from abc import ABC, abstractmethod
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Any
+
+from .cache import CacheStats, TTLCache
+
+log = logging.getLogger(__name__)
+
+# (key, encoded value, ttl seconds)
+Item = tuple[str, bytes, float]
+
+
+class CacheBackend(ABC):
+    """Shared key/value store for encoded cache entries.
+
+    Backends only move bytes with a TTL; encoding, batching and the local
+    tier live in ``TieredCache``. Both calls take whole batches so network
+    backends can pipeline them. A backend failure must never fail the bot:
+    implementations log and report misses instead of raising.
+    """
+
+    name = "backend"
+
+    @abstractmethod
+    async def get_many(self, keys: Sequence[str]) -> list[bytes | None]: ...
+
+    @abstractmethod
+    async def set_many(self, items: Sequence[Item]) -> None: ...
+
+    async def close(self) -> None:
+        return None
+
+
+class MemoryBackend(CacheBackend):
+    """In-process backend: no sharing, but the same code path as the others."""
+
+    name = "memory"
+
+    def __init__(self, *, max_entries: int = 50_000, max_bytes: int = 256 * 1024 * 1024):
+        self._store: TTLCache[str, bytes] = TTLCache(3600, max_entries=max_entries, max_bytes=max_bytes, sizeof=len)
+
+    async def get_many(self, keys: Sequence[str]) -> list[bytes | None]:
+        return [self._store.get(k) for k in keys]
+
+    async def set_many(self, items: Sequence[Item]) -> None:
+        for key, value, ttl in items:
+            self._store.set(key, value, ttl)
+
+
+# -----------------------------
+# Encoding
+# -----------------------------
+_RAW = b"j"
+_ZLIB = b"z"
+
+
+def encode_value(value: Any, *, compress_min_bytes: int = 1024) -> bytes:
+    """JSON-encode, zlib-compressing anything big enough to be worth it."""
+    data = json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode()
+    if len(data) >= compress_min_bytes:
+        return _ZLIB + zlib.compress(data, 6)
+    return _RAW + data
+
+
+def decode_value(blob: bytes) -> Any:
+    tag, data = blob[:1], blob[1:]
+    if tag == _ZLIB:
+        data = zlib.decompress(data)
+    elif tag != _RAW:
+        raise ValueError(f"Unknown cache encoding {tag!r}")
+    return json.loads(data)
+
+
+# -----------------------------
+# L1 + L2
+# -----------------------------
+@dataclass
+class TieredCacheStats:
+    l2_hits: int = 0
+    l2_misses: int = 0
+    l2_batches: int = 0  # get_many round-trips
+    writes: int = 0
+    write_batches: int = 0  # set_many round-trips
+
+
+class TieredCache:
+    """Short-lived in-process L1 in front of a shared ``CacheBackend`` (L2).
+
+    Values must be JSON-serializable. Gets that miss L1 within the same loop
+    iteration are coalesced into one ``get_many``; sets are buffered and
+    written with one ``set_many`` per flush. With a shared L2 (Redis, or one
+    SQLite file on a shared volume), several bot processes reuse each
+    other's fetches instead of each warming its own cache.
+    """
+
+    def __init__(
+        self,
+        backend: CacheBackend,
+        *,
+        namespace: str = "gwb",
+        l1_ttl: float = 10.0,
+        l1_max_entries: int = 5_000,
+        compress_min_bytes: int = 1024,
+        flush_interval: float = 0.05,
+        max_batch: int = 256,
+    ):
+        self.backend = backend
+        self._prefix = f"{namespace}:"
+        self._l1_ttl = l1_ttl
+        self._l1: TTLCache[str, Any] = TTLCache(l1_ttl, max_entries=l1_max_entries)
+        self._compress_min_bytes = compress_min_bytes
+        self._flush_interval = flush_interval
+        self._max_batch = max_batch
+        self._reads: dict[str, asyncio.Future[Any]] = {}
+        self._read_scheduled = False
+        self._read_tasks: set[asyncio.Task[None]] = set()
+        self._writes: dict[str, tuple[Any, float]] = {}
+        self._flush_timer: asyncio.TimerHandle | None = None
+        self._flush_tasks: set[asyncio.Task[None]] = set()
+        self._flushing = False
+        self._closed = False
+        self.stats = TieredCacheStats()
+
+    @property
+    def l1_stats(self) -> CacheStats:
+        return self._l1.stats
+
+    async def get(self, key: str) -> Any | None:
+        value = self._l1.get(key)
+        if value is not None:
+            return value
+        pending = self._writes.get(key)
+        if pending is not None:
+            return pending[0]
+
+        fut = self._reads.get(key)
+        if fut is None:
+            fut = self._reads[key] = asyncio.get_running_loop().create_future()
+            if not self._read_scheduled:
+                # Let every coroutine runnable in this iteration queue its key first
+                self._read_scheduled = True
+                asyncio.get_running_loop().call_soon(self._dispatch_reads)
+        return await asyncio.shield(fut)
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        if self._closed or ttl <= 0:
+            return
+        self._l1.set(key, value, min(ttl, self._l1_ttl))
+        self._writes[key] = (value, ttl)
+        if len(self._writes) >= self._max_batch:
+            # A full batch goes out now, even if a delayed flush is pending
+            self._flush_now()
+        elif self._flush_timer is None and not self._flushing:
+            self._flush_timer = asyncio.get_running_loop().call_later(self._flush_interval, self._flush_now)
+
+    def _dispatch_reads(self) -> None:
+        self._read_scheduled = False
+        batch, self._reads = self._reads, {}
+        keys = list(batch)
+        for i in range(0, len(keys), self._max_batch):
+            chunk = {k: batch[k] for k in keys[i:i + self._max_batch]}
+            task = asyncio.ensure_future(self._read_batch(chunk))
+            self._read_tasks.add(task)
+            task.add_done_callback(self._read_tasks.discard)
+
+    async def _read_batch(self, batch: dict[str, asyncio.Future[Any]]) -> None:
+        keys = list(batch)
+        self.stats.l2_batches += 1
+        try:
+            blobs = await self.backend.get_many([self._prefix + k for k in keys])
+        except Exception as e:  # backends shouldn't raise, but never strand waiters
+            log.warning("Cache backend %s read failed: %s", self.backend.name, e)
+            blobs = [None] * len(keys)
+
+        for key, blob in zip(keys, blobs):
+            value = None
+            if blob is not None:
+                try:
+                    value = decode_value(blob)
+                except (ValueError, zlib.error) as e:
+                    log.warning("Undecodable cache entry %s: %s", key, e)
+            if value is None:
+                self.stats.l2_misses += 1
+            else:
+                self.stats.l2_hits += 1
+                self._l1.set(key, value)
+            fut = batch[key]
+            if not fut.done():
+                fut.set_result(value)
+
+    def _flush_now(self) -> None:
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+        if self._flushing:
+            return  # the running flush drains whatever is added meanwhile
+        self._flushing = True
+        task = asyncio.ensure_future(self.flush())
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
+
+    async def flush(self) -> None:
+        try:
+            await self._drain()
+        finally:
+            self._flushing = False
+
+    async def _drain(self) -> None:
+        while self._writes:
+            keys = list(self._writes)[: self._max_batch]
+            items: list[Item] = []
+            for key in keys:
+                value, ttl = self._writes.pop(key)
+                try:
+                    blob = encode_value(value, compress_min_bytes=self._compress_min_bytes)
+                except (TypeError, ValueError) as e:
+                    log.warning("Unserializable cache value for %s: %s", key, e)
+                    continue
+                items.append((self._prefix + key, blob, ttl))
+            if not items:
+                continue
+            self.stats.writes += len(items)
+            self.stats.write_batches += 1
+            try:
+                await self.backend.set_many(items)
+            except Exception as e:
+                log.warning("Cache backend %s write of %d entries failed: %s", self.backend.name, len(items), e)
+
+    async def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+        # Let them finish: a flush under way has already taken its items off the buffer
+        await asyncio.gather(*self._flush_tasks, return_exceptions=True)
+        await self.flush()
+        await self.backend.close()
+
+
+def create_backend(kind: str, url: str | None = None) -> CacheBackend:
+    """Build a backend from config: ``memory``, ``sqlite`` (url = path) or ``redis`` (url)."""
+    kind = kind.lower()
+    if kind == "memory":
+        return MemoryBackend()
+    if kind == "sqlite":
+        from .disk_cache import SqliteBackend
+
+        return SqliteBackend(url or ".cache/gwydeonbot.sqlite3")
+    if kind == "redis":
+        from .redis_backend import RedisBackend
+
+        return RedisBackend(url or "redis://127.0.0.1:6379/0")
+    raise ValueError(f"Unknown cache backend: {kind}")
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import sqlite3
+import time
+from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, TypeVar
+
+from .cache_backend import CacheBackend, Item
+
+log = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    expires_at REAL NOT NULL
+)
+"""
+
+# SQLite's default limit on bound parameters is 999 on older builds
+_MAX_PARAMS = 900
+
+
+class SqliteBackend(CacheBackend):
+    """Persistent SQLite (WAL) cache backend.
+
+    Every disk access runs on a dedicated single-thread executor, so the event
+    loop never blocks on I/O. The database is opened on first use; reads and
+    writes arrive already batched from ``TieredCache``. Several processes on
+    one host can share the same file.
+
+    Expiry uses wall-clock time because it has to survive restarts.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path: str | Path):
+        self._path = Path(path)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="disk-cache")
+        self._conn: sqlite3.Connection | None = None
+
+    async def _run(self, fn: Callable[[sqlite3.Connection], T]) -> T:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, lambda: fn(self._connect()))
+
+    def _connect(self) -> sqlite3.Connection:
+        # Executor thread only
+        if self._conn is None:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self._path, check_same_thread=False, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(_SCHEMA)
+            # Table of the old JSON-text DiskCache; its rows can't be decoded any more
+            conn.execute("DROP TABLE IF EXISTS entries")
+            conn.execute("DELETE FROM cache WHERE expires_at <= ?", (time.time(),))
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    async def get_many(self, keys: Sequence[str]) -> list[bytes | None]:
+        def read(conn: sqlite3.Connection) -> list[bytes | None]:
+            now = time.time()
+            found: dict[str, bytes] = {}
+            for i in range(0, len(keys), _MAX_PARAMS):
+                chunk = keys[i:i + _MAX_PARAMS]
+                marks = ",".join("?" * len(chunk))
+                rows = conn.execute(
+                    f"SELECT key, value FROM cache WHERE key IN ({marks}) AND expires_at > ?",
+                    (*chunk, now),
+                )
+                found.update((k, bytes(v)) for k, v in rows)
+            return [found.get(k) for k in keys]
+
+        try:
+            return await self._run(read)
+        except sqlite3.Error as e:
+            log.warning("Disk cache read of %d keys failed: %s", len(keys), e)
+            return [None] * len(keys)
+
+    async def set_many(self, items: Sequence[Item]) -> None:
+        def write(conn: sqlite3.Connection) -> None:
+            now = time.time()
+            rows = [(k, v, now + ttl) for k, v, ttl in items]
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+                    rows,
+                )
+
+        try:
+            await self._run(write)
+        except sqlite3.Error as e:
+            log.warning("Disk cache write of %d entries failed: %s", len(items), e)
+
+    async def close(self) -> None:
+        def shutdown(conn: sqlite3.Connection) -> None:
+            conn.close()
+
+        if self._conn is not None:
+            await self._run(shutdown)
+            self._conn = None
+        self._executor.shutdown(wait=False)
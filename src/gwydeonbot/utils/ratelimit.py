@@ -0,0 +1,354 @@
+from __future__ import annotations
+
+import asyncio
+import itertools
+import time
+import weakref
+from collections.abc import AsyncIterator, Callable, Iterator
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from enum import IntEnum
+
+from ..domain.errors import WowRateLimited
+
+
+class Priority(IntEnum):
+    """Upstream request classes, most urgent first."""
+
+    INTERACTIVE = 0  # a user is waiting on a slash command
+    BATCH = 1  # bulk work behind a command (guild member summaries)
+    BACKGROUND = 2  # prefetch, pollers, refreshes nobody is waiting on
+
+
+class PriorityCell:
+    """Priority of one scope of work, as held in the context.
+
+    ``escalate`` raises a scope while it runs, and with it every scope opened
+    inside; queued requests of those scopes move up at once.
+    """
+
+    __slots__ = ("value", "boost", "parent")
+
+    def __init__(self, value: Priority, parent: PriorityCell | None = None):
+        self.value = value
+        self.boost: Priority | None = None
+        self.parent = parent
+
+    def effective(self) -> Priority:
+        p = self.value
+        cell: PriorityCell | None = self
+        while cell is not None:
+            if cell.boost is not None and cell.boost < p:
+                p = cell.boost
+            cell = cell.parent
+        return p
+
+    def escalate(self, priority: Priority) -> None:
+        if priority >= self.effective():
+            return
+        self.boost = priority
+        for limiter in list(_limiters):
+            limiter._requeue()
+
+
+_priority: ContextVar[PriorityCell] = ContextVar("upstream_priority", default=PriorityCell(Priority.INTERACTIVE))
+# Every limiter, so an escalation can re-sort their queues
+_limiters: weakref.WeakSet[RateLimiter] = weakref.WeakSet()
+
+
+def current_priority() -> Priority:
+    return _priority.get().effective()
+
+
+@contextmanager
+def request_priority(priority: Priority) -> Iterator[None]:
+    """Run the upstream requests made inside (and by tasks spawned there) at ``priority``."""
+    token = _priority.set(PriorityCell(priority, _priority.get()))
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+@contextmanager
+def shared_priority() -> Iterator[PriorityCell]:
+    """Scope for work several callers wait on; each one ``escalate``s it to its own priority."""
+    cell = PriorityCell(current_priority(), _priority.get())
+    token = _priority.set(cell)
+    try:
+        yield cell
+    finally:
+        _priority.reset(token)
+
+
+@dataclass
+class TokenBucket:
+    rate: float  # tokens per second
+    capacity: float
+    tokens: float = field(default=-1.0)
+    updated: float = field(default=0.0)
+
+    def __post_init__(self) -> None:
+        if self.tokens < 0:
+            self.tokens = self.capacity
+
+    def _refill(self, now: float) -> None:
+        if self.updated:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, now: float, reserve: float = 0.0) -> float:
+        """Seconds until one token is available with ``reserve`` (fraction of capacity) left over."""
+        self._refill(now)
+        need = min(self.capacity, 1 + reserve * self.capacity)
+        return 0.0 if self.tokens >= need else (need - self.tokens) / self.rate
+
+    def take(self, now: float) -> None:
+        self._refill(now)
+        self.tokens -= 1
+
+    def give_back(self) -> None:
+        self.tokens = min(self.capacity, self.tokens + 1)
+
+
+@dataclass
+class RateLimiterStats:
+    acquired: int = 0
+    rejected: int = 0  # gave up after max_wait
+    waited: int = 0  # acquisitions that had to wait at all
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+
+
+# Per class: how long a caller may queue, how many of its requests may be in
+# flight (``slot``), and the share of each bucket it must leave untouched
+DEFAULT_MAX_WAIT = {Priority.BATCH: 30.0, Priority.BACKGROUND: 120.0}
+DEFAULT_CONCURRENCY: dict[Priority, int | None] = {
+    Priority.INTERACTIVE: None,
+    Priority.BATCH: 16,
+    Priority.BACKGROUND: 4,
+}
+DEFAULT_RESERVE = {Priority.INTERACTIVE: 0.0, Priority.BATCH: 0.1, Priority.BACKGROUND: 0.25}
+
+
+@dataclass
+class _Waiter:
+    cell: PriorityCell
+    seq: int
+    future: asyncio.Future[Priority]  # resolves to the class it was granted as
+    holds_slot: bool
+    timer: asyncio.TimerHandle | None = None  # expiry, per the class it currently queues as
+
+
+def _by_class(entry: tuple[Priority, int, _Waiter]) -> tuple[Priority, int]:
+    return entry[0], entry[1]
+
+
+class RateLimiter:
+    """Client-side quota guard and priority scheduler over one or more token buckets.
+
+    Callers are served by ``Priority`` and then in arrival order: a queued
+    background request is overtaken by every interactive one that arrives
+    after it. Lower classes also leave a reserve of each bucket untouched, so
+    they soak up spare quota without making interactive callers queue, and
+    ``slot`` caps how many of a class's requests are in flight at once.
+
+    A caller that would wait longer than its class's max wait gets
+    ``WowRateLimited`` (straight away when the buckets alone already say
+    so), the same error an upstream 429 produces. The class comes from
+    ``request_priority`` unless passed explicitly, and a queued request
+    moves up when its scope is escalated (see ``shared_priority``).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        buckets: list[TokenBucket],
+        *,
+        max_wait: float = 5.0,
+        class_max_wait: dict[Priority, float] | None = None,
+        concurrency: dict[Priority, int | None] | None = None,
+        reserve: dict[Priority, float] | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self._buckets = buckets
+        self._max_wait = {p: max(max_wait, DEFAULT_MAX_WAIT.get(p, 0.0)) for p in Priority}
+        self._max_wait.update(class_max_wait or {})
+        self._concurrency = {**DEFAULT_CONCURRENCY, **(concurrency or {})}
+        self._reserve = {**DEFAULT_RESERVE, **(reserve or {})}
+        self._clock = clock
+        self._queue: list[_Waiter] = []
+        self._seq = itertools.count()
+        self._active = dict.fromkeys(Priority, 0)
+        self._wake = asyncio.Event()
+        self._pump_task: asyncio.Task[None] | None = None
+        self.stats = RateLimiterStats()
+        self.class_stats = {p: RateLimiterStats() for p in Priority}
+        _limiters.add(self)
+
+    @classmethod
+    def blizzard(cls, *, max_wait: float = 5.0, share: float = 1.0) -> RateLimiter:
+        # Documented Blizzard API quota: 100 req/s and 36,000 req/h per client.
+        # ``share`` is this process's slice of it when several processes use one client.
+        return cls(
+            "blizzard",
+            [
+                TokenBucket(rate=100 * share, capacity=100 * share),
+                TokenBucket(rate=36_000 * share / 3600, capacity=36_000 * share),
+            ],
+            max_wait=max_wait,
+        )
+
+    @classmethod
+    def per_minute(cls, name: str, requests_per_minute: float, *, burst: float = 10, max_wait: float = 5.0) -> RateLimiter:
+        return cls(name, [TokenBucket(rate=requests_per_minute / 60, capacity=burst)], max_wait=max_wait)
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(1 for w in self._queue if not w.future.done())
+
+    def waiting(self, priority: Priority) -> int:
+        return sum(1 for w in self._queue if not w.future.done() and w.cell.effective() == priority)
+
+    def in_flight(self, priority: Priority) -> int:
+        return self._active[priority]
+
+    async def acquire(self, priority: Priority | None = None) -> None:
+        """Take one token (no concurrency slot)."""
+        await self._acquire(_priority.get() if priority is None else PriorityCell(priority), holds_slot=False)
+
+    @asynccontextmanager
+    async def slot(self, priority: Priority | None = None) -> AsyncIterator[None]:
+        """Take one token and hold one of the class's in-flight slots until exit."""
+        cell = _priority.get() if priority is None else PriorityCell(priority)
+        granted = await self._acquire(cell, holds_slot=True)
+        try:
+            yield
+        finally:
+            self._release_slot(granted)
+
+    async def _acquire(self, cell: PriorityCell, *, holds_slot: bool) -> Priority:
+        start = self._clock()
+        p = cell.effective()
+        if self._token_wait(p, start) > self._max_wait[p]:
+            self._reject(p)
+
+        if not self._queue and self._ready(p, holds_slot, start):
+            self._grant(p, holds_slot, start)
+            granted = p
+        else:
+            granted = await self._wait_in_queue(cell, p, holds_slot)
+
+        waited = self._clock() - start
+        for st in (self.stats, self.class_stats[granted]):
+            st.acquired += 1
+            if waited > 0.001:
+                st.waited += 1
+                st.total_wait += waited
+                st.max_wait = max(st.max_wait, waited)
+        return granted
+
+    async def _wait_in_queue(self, cell: PriorityCell, p: Priority, holds_slot: bool) -> Priority:
+        loop = asyncio.get_running_loop()
+        waiter = _Waiter(cell, next(self._seq), loop.create_future(), holds_slot)
+        # Not wait_for: its cancellation can land after the pump granted the waiter
+        waiter.timer = loop.call_later(self._max_wait[p], self._expire, waiter)
+        self._queue.append(waiter)
+        self._kick()
+        try:
+            return await waiter.future
+        except asyncio.TimeoutError:
+            self._reject(cell.effective())
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled() and waiter.future.exception() is None:
+                # Granted, but the caller is gone: hand the token and slot back
+                for b in self._buckets:
+                    b.give_back()
+                if holds_slot:
+                    self._release_slot(waiter.future.result())
+            raise
+        finally:
+            waiter.timer.cancel()
+
+    @staticmethod
+    def _expire(waiter: _Waiter) -> None:
+        if not waiter.future.done():
+            waiter.future.set_exception(asyncio.TimeoutError())
+
+    def _release_slot(self, p: Priority) -> None:
+        self._active[p] -= 1
+        if self._queue:
+            self._kick()
+
+    def _ready(self, p: Priority, holds_slot: bool, now: float) -> bool:
+        return self._has_slot(p, holds_slot) and self._token_wait(p, now) == 0
+
+    def _has_slot(self, p: Priority, holds_slot: bool) -> bool:
+        cap = self._concurrency.get(p)
+        return not holds_slot or cap is None or self._active[p] < cap
+
+    def _token_wait(self, p: Priority, now: float) -> float:
+        reserve = self._reserve.get(p, 0.0)
+        return max(b.wait_time(now, reserve) for b in self._buckets)
+
+    def _grant(self, p: Priority, holds_slot: bool, now: float) -> None:
+        for b in self._buckets:
+            b.take(now)
+        if holds_slot:
+            self._active[p] += 1
+
+    def _requeue(self) -> None:
+        # A scope was escalated: let the pump re-sort, and give escalated
+        # waiters no more than their new class's max wait from now on
+        if not self._queue:
+            return
+        loop = asyncio.get_running_loop()
+        for waiter in self._queue:
+            if waiter.future.done() or waiter.timer is None:
+                continue
+            deadline = loop.time() + self._max_wait[waiter.cell.effective()]
+            if deadline < waiter.timer.when():
+                waiter.timer.cancel()
+                waiter.timer = loop.call_at(deadline, self._expire, waiter)
+        self._kick()
+
+    def _kick(self) -> None:
+        self._wake.set()
+        if self._pump_task is None or self._pump_task.done():
+            self._pump_task = asyncio.create_task(self._pump(), name=f"ratelimit-{self.name}")
+
+    async def _pump(self) -> None:
+        # Hands tokens to queued callers, best class first
+        while True:
+            self._wake.clear()
+            # Drop timed-out/cancelled callers; classes are re-read since scopes can be escalated
+            queue = sorted(((w.cell.effective(), w.seq, w) for w in self._queue if not w.future.done()), key=_by_class)
+            self._queue = [w for _, _, w in queue]
+            if not queue:
+                return
+
+            now = self._clock()
+            delay: float | None = None  # None: only a slot release can unblock the queue
+            for p, _, waiter in queue:
+                if not self._has_slot(p, waiter.holds_slot):
+                    continue  # capped class: the next class may still go
+                delay = self._token_wait(p, now)
+                if delay == 0:
+                    self._grant(p, waiter.holds_slot, now)
+                    self._queue.remove(waiter)
+                    waiter.future.set_result(p)
+                break
+
+            if delay != 0:
+                # Sleep until tokens refill, unless a new arrival or a release changes the picture
+                try:
+                    await asyncio.wait_for(self._wake.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+
+    def _reject(self, p: Priority) -> None:
+        self.stats.rejected += 1
+        self.class_stats[p].rejected += 1
+        raise WowRateLimited(f"Rate limited ({self.name}, local quota)")
@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Sequence
+from typing import Any
+from urllib.parse import unquote, urlparse
+
+from .cache_backend import CacheBackend, Item
+
+log = logging.getLogger(__name__)
+
+
+class RespError(Exception):
+    """Error reply (``-ERR ...``) from the server."""
+
+
+# Anything after which the connection can't be trusted (auth failures included)
+_CONNECTION_ERRORS = (OSError, EOFError, asyncio.TimeoutError, RespError, ValueError)
+
+
+class RespConnection:
+    """Minimal RESP2 client: one connection, pipelined commands.
+
+    ``pipeline`` writes a whole batch of commands in one go and then reads
+    the replies in order, so a batch costs one round-trip. Calls are
+    serialized on a lock; any I/O error, or a caller cancelled mid-batch,
+    drops the connection and the next call reconnects. Works with Redis, Valkey, KeyDB, Dragonfly, etc.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 6379,
+        *,
+        db: int = 0,
+        password: str | None = None,
+        username: str | None = None,
+        timeout: float = 1.0,
+    ):
+        self._host = host
+        self._port = port
+        self._db = db
+        self._password = password
+        self._username = username
+        self._timeout = timeout
+        self._reader: asyncio.StreamReader | None = None
+        self._writer: asyncio.StreamWriter | None = None
+        self._lock = asyncio.Lock()
+
+    @classmethod
+    def from_url(cls, url: str, **kwargs: Any) -> RespConnection:
+        """``redis://[[user]:password@]host[:port][/db]``"""
+        u = urlparse(url)
+        if u.scheme not in ("redis", ""):
+            raise ValueError(f"Unsupported Redis URL scheme: {u.scheme}")
+        db = int(u.path.lstrip("/") or 0)
+        return cls(
+            u.hostname or "127.0.0.1",
+            u.port or 6379,
+            db=db,
+            password=unquote(u.password) if u.password else None,
+            username=unquote(u.username) if u.username else None,
+            **kwargs,
+        )
+
+    async def pipeline(self, commands: Sequence[Sequence[bytes | str | int | float]]) -> list[Any]:
+        async with self._lock:
+            try:
+                return await asyncio.wait_for(self._pipeline(commands), self._timeout)
+            except _CONNECTION_ERRORS:
+                await self._drop()
+                raise
+            except BaseException:
+                # Cancelled mid-batch: the replies left unread would go to the next batch
+                self._discard()
+                raise
+
+    async def _pipeline(self, commands: Sequence[Sequence[bytes | str | int | float]]) -> list[Any]:
+        if self._writer is None:
+            await self._connect()
+        assert self._reader is not None and self._writer is not None
+        self._writer.write(b"".join(self._encode(cmd) for cmd in commands))
+        await self._writer.drain()
+        return [await self._read_reply(self._reader) for _ in commands]
+
+    async def _connect(self) -> None:
+        self._reader, self._writer = await asyncio.open_connection(self._host, self._port)
+        setup: list[list[bytes | str | int | float]] = []
+        if self._password:
+            setup.append(["AUTH", self._username, self._password] if self._username else ["AUTH", self._password])
+        if self._db:
+            setup.append(["SELECT", self._db])
+        if setup:
+            self._writer.write(b"".join(self._encode(cmd) for cmd in setup))
+            await self._writer.drain()
+            for _ in setup:
+                reply = await self._read_reply(self._reader)
+                if isinstance(reply, RespError):
+                    raise reply
+
+    def _discard(self) -> asyncio.StreamWriter | None:
+        writer, self._reader, self._writer = self._writer, None, None
+        if writer is not None:
+            writer.close()
+        return writer
+
+    async def _drop(self) -> None:
+        writer = self._discard()
+        if writer is not None:
+            try:
+                await writer.wait_closed()
+            except OSError:
+                pass
+
+    async def close(self) -> None:
+        async with self._lock:
+            await self._drop()
+
+    @staticmethod
+    def _encode(cmd: Sequence[bytes | str | int | float]) -> bytes:
+        out = [b"*%d\r\n" % len(cmd)]
+        for arg in cmd:
+            data = arg if isinstance(arg, bytes) else str(arg).encode()
+            out.append(b"$%d\r\n%s\r\n" % (len(data), data))
+        return b"".join(out)
+
+    @classmethod
+    async def _read_reply(cls, reader: asyncio.StreamReader) -> Any:
+        line = await reader.readuntil(b"\r\n")
+        kind, payload = line[:1], line[1:-2]
+        if kind == b"+":
+            return payload.decode()
+        if kind == b"-":
+            # Returned, not raised: one failed command must not desync the pipeline
+            return RespError(payload.decode())
+        if kind == b":":
+            return int(payload)
+        if kind == b"$":
+            n = int(payload)
+            if n < 0:
+                return None
+            return (await reader.readexactly(n + 2))[:-2]
+        if kind == b"*":
+            n = int(payload)
+            if n < 0:
+                return None
+            return [await cls._read_reply(reader) for _ in range(n)]
+        raise ValueError(f"Bad RESP reply: {line!r}")
+
+
+class RedisBackend(CacheBackend):
+    """Shared cache on any Redis-protocol server.
+
+    Reads are one ``MGET`` per batch; writes are one pipeline of
+    ``SET key value PX ttl``. Server errors degrade to cache misses, and
+    after a connection failure the server is left alone for ``retry_after``
+    seconds so a dead Redis costs nothing on the command path.
+    """
+
+    name = "redis"
+
+    def __init__(self, url: str, *, timeout: float = 1.0, retry_after: float = 5.0):
+        self._conn = RespConnection.from_url(url, timeout=timeout)
+        self._retry_after = retry_after
+        self._down_until = 0.0
+
+    def _available(self) -> bool:
+        return time.monotonic() >= self._down_until
+
+    def _mark_down(self) -> None:
+        self._down_until = time.monotonic() + self._retry_after
+
+    async def get_many(self, keys: Sequence[str]) -> list[bytes | None]:
+        if not keys or not self._available():
+            return [None] * len(keys)
+        try:
+            (reply,) = await self._conn.pipeline([["MGET", *keys]])
+        except _CONNECTION_ERRORS as e:
+            log.warning("Redis MGET of %d keys failed: %s", len(keys), e)
+            self._mark_down()
+            return [None] * len(keys)
+        if isinstance(reply, RespError) or not isinstance(reply, list):
+            log.warning("Redis MGET failed: %s", reply)
+            return [None] * len(keys)
+        return [v if isinstance(v, bytes) else None for v in reply]
+
+    async def set_many(self, items: Sequence[Item]) -> None:
+        if not items or not self._available():
+            return
+        commands = [["SET", key, value, "PX", max(1, int(ttl * 1000))] for key, value, ttl in items]
+        try:
+            replies = await self._conn.pipeline(commands)
+        except _CONNECTION_ERRORS as e:
+            log.warning("Redis pipeline of %d SETs failed: %s", len(items), e)
+            self._mark_down()
+            return
+        errors = [r for r in replies if isinstance(r, RespError)]
+        if errors:
+            log.warning("Redis rejected %d of %d SETs: %s", len(errors), len(items), errors[0])
+
+    async def close(self) -> None:
+        await self._conn.close()
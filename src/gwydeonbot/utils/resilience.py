@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import TypeVar
+
+from ..domain.errors import WowRateLimited, WowUnavailable, WowUpstreamError
+
+log = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+def parse_retry_after(value: str | None, default: float = 1.0) -> float:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)."""
+    if not value:
+        return default
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return default
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    attempts: int = 3
+    base_delay: float = 0.25
+    max_delay: float = 4.0
+    # Don't sit on a Retry-After longer than this; surface the 429 instead
+    max_retry_after: float = 10.0
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff for the given retry (0-based)."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2**attempt)))
+
+
+class CircuitBreaker:
+    """Consecutive-failure breaker: closed -> open -> half-open -> closed."""
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self._failure_threshold = failure_threshold
+        self._reset_timeout = reset_timeout
+        self._clock = clock
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._trial_in_flight = False
+        self.opens = 0
+        self.short_circuited = 0
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if self._clock() - self._opened_at >= self._reset_timeout:
+            return "half-open"
+        return "open"
+
+    def before_call(self) -> None:
+        state = self.state
+        if state == "closed":
+            return
+        if state == "half-open" and not self._trial_in_flight:
+            # Let exactly one probe through
+            self._trial_in_flight = True
+            return
+        self.short_circuited += 1
+        raise WowUnavailable(f"{self.name} no disponible (circuito abierto)")
+
+    def record_success(self) -> None:
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+
+    def abandon_trial(self) -> None:
+        """The probe was cancelled before it told us anything."""
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        if self._trial_in_flight or self._failures >= self._failure_threshold:
+            if self._opened_at is None:
+                self.opens += 1
+                log.warning("Circuit %s opened after %d failures", self.name, self._failures)
+            self._opened_at = self._clock()
+            self._trial_in_flight = False
+
+
+class Resilience:
+    """Retries for idempotent GETs plus one circuit breaker per endpoint family.
+
+    Retried: ``WowUpstreamError`` (5xx/timeout/network) with jittered backoff,
+    and upstream 429s after their ``Retry-After``. Everything else, including
+    404s and local rate-limit rejections, passes straight through.
+    """
+
+    def __init__(
+        self,
+        upstream: str,
+        policy: RetryPolicy | None = None,
+        *,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+    ):
+        self.upstream = upstream
+        self.policy = policy or RetryPolicy()
+        self._failure_threshold = failure_threshold
+        self._reset_timeout = reset_timeout
+        self.breakers: dict[str, CircuitBreaker] = {}
+        self.retries = 0
+
+    def breaker(self, family: str) -> CircuitBreaker:
+        b = self.breakers.get(family)
+        if b is None:
+            b = self.breakers[family] = CircuitBreaker(
+                f"{self.upstream}:{family}",
+                failure_threshold=self._failure_threshold,
+                reset_timeout=self._reset_timeout,
+            )
+        return b
+
+    async def call(self, family: str, fn: Callable[[], Awaitable[T]]) -> T:
+        # The breaker judges whole calls; retries of one call count once
+        breaker = self.breaker(family)
+        breaker.before_call()
+        attempt = 0
+        while True:
+            try:
+                result = await fn()
+            except WowUpstreamError:
+                if attempt + 1 >= self.policy.attempts:
+                    breaker.record_failure()
+                    raise
+                delay = self.policy.backoff(attempt)
+            except WowRateLimited as e:
+                ra = e.retry_after
+                if ra is None:
+                    # Our own limiter gave up; the upstream was never asked
+                    breaker.abandon_trial()
+                    raise
+                # A 429 means "slow down", not "broken": doesn't trip the breaker
+                if ra > self.policy.max_retry_after or attempt + 1 >= self.policy.attempts:
+                    breaker.record_success()
+                    raise
+                delay = ra + self.policy.backoff(0)
+            except asyncio.CancelledError:
+                breaker.abandon_trial()
+                raise
+            except Exception:
+                # 404 & co.: the upstream answered, so it is healthy
+                breaker.record_success()
+                raise
+            else:
+                breaker.record_success()
+                return result
+
+            attempt += 1
+            self.retries += 1
+            await asyncio.sleep(delay)
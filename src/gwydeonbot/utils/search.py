@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import difflib
+from bisect import bisect_left
+from collections.abc import Hashable, Iterable
+from typing import Generic, TypeVar
+
+T = TypeVar("T", bound=Hashable)
+
+
+class SearchIndex(Generic[T]):
+    """Prefix + fuzzy lookup over a small, static set of normalized keys.
+
+    Keys are slug-like (words joined by ``-``). A query matches a key by
+    prefix of the whole key first, then by prefix of any later word
+    ("errantes" finds "los-errantes"), and finally by similarity for typos.
+    Queries must be normalized the same way as the keys.
+    """
+
+    def __init__(self, entries: Iterable[tuple[str, T]]):
+        self._items: dict[str, T] = {}
+        terms: list[tuple[str, int, str]] = []  # (term, rank, key)
+        for key, item in entries:
+            if not key or key in self._items:
+                continue
+            self._items[key] = item
+            terms.append((key, 0, key))
+            pos = key.find("-")
+            while pos != -1:
+                if pos + 1 < len(key):
+                    terms.append((key[pos + 1:], 1, key))
+                pos = key.find("-", pos + 1)
+        terms.sort()
+        self._terms = terms
+        self._keys = sorted(self._items)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def search(self, query: str, limit: int = 25, *, fuzzy_cutoff: float = 0.6) -> list[T]:
+        if not query:
+            return self._take((self._items[k] for k in self._keys), limit)
+
+        matches: list[tuple[int, str]] = []
+        i = bisect_left(self._terms, (query,))
+        while i < len(self._terms) and self._terms[i][0].startswith(query):
+            _, rank, key = self._terms[i]
+            matches.append((rank, key))
+            i += 1
+        matches.sort()
+        found = [self._items[key] for _, key in matches]
+
+        if len(found) < limit:
+            close = difflib.get_close_matches(query, self._keys, n=limit, cutoff=fuzzy_cutoff)
+            found.extend(self._items[key] for key in close)
+        return self._take(found, limit)
+
+    @staticmethod
+    def _take(items: Iterable[T], limit: int) -> list[T]:
+        out: list[T] = []
+        seen: set[T] = set()
+        for item in items:
+            if item in seen:
+                continue
+            seen.add(item)
+            out.append(item)
+            if len(out) >= limit:
+                break
+        return out
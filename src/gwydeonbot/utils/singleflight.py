@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+from dataclasses import dataclass
+from typing import Generic, TypeVar
+
+from .ratelimit import PriorityCell, current_priority, shared_priority
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+@dataclass
+class SingleFlightStats:
+    hits: int = 0  # callers that joined an in-flight call
+    misses: int = 0  # callers that started a new call
+
+
+@dataclass
+class _Flight(Generic[V]):
+    future: asyncio.Future[V]
+    priority: PriorityCell
+    waiters: int = 0
+
+
+class SingleFlight(Generic[K, V]):
+    """Coalesce concurrent calls with the same key into one.
+
+    The first caller for a key starts the work; everyone arriving while it is
+    in flight awaits the same result (or exception). The shared result must be
+    treated as read-only. Cancelling a waiter cancels the shared call only
+    once no other waiter is left, so abandoned work doesn't go on using quota.
+
+    The call's upstream requests run at the most urgent priority among its
+    waiters: a user joining a background refresh doesn't queue behind it.
+    """
+
+    def __init__(self) -> None:
+        self._inflight: dict[K, _Flight[V]] = {}
+        self.stats = SingleFlightStats()
+
+    def __len__(self) -> int:
+        return len(self._inflight)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._inflight
+
+    async def do(self, key: K, fn: Callable[[], Awaitable[V]]) -> V:
+        flight = self._inflight.get(key)
+        if flight is not None:
+            self.stats.hits += 1
+            flight.priority.escalate(current_priority())
+        else:
+            self.stats.misses += 1
+            with shared_priority() as priority:
+                flight = _Flight(asyncio.ensure_future(fn()), priority)
+            self._inflight[key] = flight
+            flight.future.add_done_callback(lambda f: self._forget(key, f))
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.future)
+        finally:
+            flight.waiters -= 1
+            if not flight.waiters and not flight.future.done():
+                # Every waiter was cancelled: stop the call, and let the next caller start afresh
+                if self._inflight.get(key) is flight:
+                    del self._inflight[key]
+                flight.future.cancel()
+
+    def _forget(self, key: K, fut: asyncio.Future[V]) -> None:
+        flight = self._inflight.get(key)
+        if flight is not None and flight.future is fut:
+            del self._inflight[key]
+        # Mark the exception as retrieved even if every waiter went away
+        if not fut.cancelled():
+            fut.exception()
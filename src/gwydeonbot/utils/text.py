@@ -1,15 +1,43 @@
 from __future__ import annotations
 
+import re
+import unicodedata
+
+_DASHES_RE = re.compile(r"-{2,}")
+
+
+def fold_accents(text: str) -> str:
+    """Strip diacritics, e.g. "Dun Mödr" -> "Dun Modr"."""
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
 
 def normalize_realm_slug(realm: str) -> str:
-    return (
-        realm.strip()
+    # Blizzard realm slugs are ASCII: "Pozo de Almas" -> "pozo-de-almas", "C'Thun" -> "cthun"
+    slug = (
+        fold_accents(realm.strip())
         .lower()
         .replace("’", "")
         .replace("'", "")
         .replace(" ", "-")
     )
+    return _DASHES_RE.sub("-", slug)
 
 
 def normalize_character_name(name: str) -> str:
     return name.strip().lower()
+
+
+def normalize_guild_slug(guild: str) -> str:
+    # Same rules as realm slugs, but accents are kept as typed
+    slug = guild.strip().lower().replace("’", "").replace("'", "").replace(" ", "-")
+    return _DASHES_RE.sub("-", slug)
+
+
+def format_age(seconds: float) -> str:
+    if seconds < 60:
+        return "unos segundos"
+    minutes = int(seconds // 60)
+    if minutes < 60:
+        return f"{minutes} min"
+    return f"{minutes // 60} h {minutes % 60} min"
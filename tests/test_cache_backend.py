@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Sequence
+
+from gwydeonbot.utils.cache_backend import Item, MemoryBackend, TieredCache
+
+
+class RecordingBackend(MemoryBackend):
+    def __init__(self, *, write_delay: float = 0.0) -> None:
+        super().__init__()
+        self.batches: list[int] = []
+        self._write_delay = write_delay
+
+    async def set_many(self, items: Sequence[Item]) -> None:
+        await asyncio.sleep(self._write_delay)
+        self.batches.append(len(items))
+        await super().set_many(items)
+
+
+def test_full_batch_flushes_without_waiting_for_the_timer() -> None:
+    async def main() -> None:
+        backend = RecordingBackend()
+        cache = TieredCache(backend, flush_interval=60, max_batch=4)
+        cache.set("first", 0, 60)  # arms the delayed flush
+        for i in range(3):
+            cache.set(f"k{i}", i, 60)
+        await asyncio.sleep(0.01)
+        assert backend.batches == [4]
+        await cache.close()
+
+    asyncio.run(main())
+
+
+def test_close_keeps_writes_of_a_flush_in_progress() -> None:
+    async def main() -> None:
+        backend = RecordingBackend(write_delay=0.1)
+        cache = TieredCache(backend, flush_interval=0)
+        cache.set("a", 1, 60)
+        await asyncio.sleep(0.01)  # the flush has taken "a" off the buffer
+        await cache.close()
+        assert await backend.get_many(["gwb:a"]) == [b"j1"]
+
+    asyncio.run(main())
+
+
+def test_reads_are_coalesced() -> None:
+    async def main() -> None:
+        backend = MemoryBackend()
+        await backend.set_many([("gwb:a", b"j1", 60), ("gwb:b", b"j2", 60)])
+        cache = TieredCache(backend)
+        assert await asyncio.gather(cache.get("a"), cache.get("b"), cache.get("c")) == [1, 2, None]
+        assert cache.stats.l2_batches == 1
+        await cache.close()
+
+    asyncio.run(main())
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+from gwydeonbot.domain.models import CharacterOverview, MythicPlusSummary
+from gwydeonbot.services.character_service import CharacterService
+from gwydeonbot.services.prefetch import PrefetchScheduler
+from gwydeonbot.utils.cache_backend import MemoryBackend, TieredCache
+from gwydeonbot.utils.ratelimit import RateLimiter
+
+
+def service(shared: TieredCache | None = None) -> tuple[CharacterService, list[str]]:
+    blizzard = SimpleNamespace(region="eu")
+    characters = CharacterService(blizzard, SimpleNamespace(), shared_cache=shared)  # type: ignore[arg-type]
+    fetches: list[str] = []
+
+    async def fetch_overview(*, realm_slug: str, character_name: str) -> CharacterOverview:
+        fetches.append(character_name)
+        return CharacterOverview(
+            name=character_name,
+            realm=realm_slug,
+            region="eu",
+            level="80",
+            class_name="Mago",
+            class_id=8,
+            race="Humano",
+            faction="Alianza",
+            spec=None,
+            guild=None,
+            item_level="620",
+            thumbnail_url=None,
+            armory_url="https://example.invalid",
+            mythic_plus=MythicPlusSummary(score="2500", top_runs=("+12 Ara-Kara",)),
+            raid_progress_lines=("Liberación: 8/8 N",),
+            fetched_at=time.time(),
+        )
+
+    characters._fetch_overview = fetch_overview  # type: ignore[method-assign]
+    return characters, fetches
+
+
+def test_every_lookup_is_learned() -> None:
+    characters, _ = service()
+    prefetch = PrefetchScheduler(characters, RateLimiter("test", []), learn_min_lookups=1)
+    for name in ("thrall", "jaina", "anduin"):
+        characters.on_lookup("sanguino", name)  # type: ignore[misc]
+    assert sorted(name for _, name in prefetch.learned()) == ["anduin", "jaina", "thrall"]
+
+
+def test_workers_adopt_a_shared_prefetch() -> None:
+    async def main() -> None:
+        # One backend, a cache tier per process
+        backend = MemoryBackend()
+        first_tier, second_tier = TieredCache(backend), TieredCache(backend)
+        first, first_fetches = service(first_tier)
+        second, second_fetches = service(second_tier)
+        assert await first.prefetch_overview(realm_slug="sanguino", character_name="thrall", max_age=480)
+        await first_tier.flush()
+        assert not await second.prefetch_overview(realm_slug="sanguino", character_name="thrall", max_age=480)
+        assert (first_fetches, second_fetches) == (["thrall"], [])
+        overview = await second.get_character_overview(realm_slug="sanguino", character_name="thrall")
+        assert overview.mythic_plus.top_runs == ("+12 Ara-Kara",)
+        assert overview.raid_progress_lines == ("Liberación: 8/8 N",)
+        assert second.prefetch_hits == 1
+        await first_tier.close()
+        await second_tier.close()
+
+    asyncio.run(main())
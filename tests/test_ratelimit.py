@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from gwydeonbot.domain.errors import WowRateLimited
+from gwydeonbot.utils.ratelimit import (
+    Priority,
+    RateLimiter,
+    TokenBucket,
+    current_priority,
+    request_priority,
+    shared_priority,
+)
+from gwydeonbot.utils.singleflight import SingleFlight
+
+NO_RESERVE = {Priority.BATCH: 0.0, Priority.BACKGROUND: 0.0}
+
+
+def limiter(rate: float = 1000, capacity: float = 1000, **kwargs) -> RateLimiter:
+    return RateLimiter("test", [TokenBucket(rate=rate, capacity=capacity)], **kwargs)
+
+
+def test_interactive_overtakes_queued_background() -> None:
+    async def main() -> list[Priority]:
+        rl = limiter(rate=20, capacity=1, reserve=NO_RESERVE)
+        await rl.acquire(Priority.INTERACTIVE)  # drain the bucket
+        order: list[Priority] = []
+
+        async def one(p: Priority) -> None:
+            await rl.acquire(p)
+            order.append(p)
+
+        background = asyncio.ensure_future(one(Priority.BACKGROUND))
+        await asyncio.sleep(0)
+        await asyncio.gather(one(Priority.INTERACTIVE), background)
+        return order
+
+    assert asyncio.run(main()) == [Priority.INTERACTIVE, Priority.BACKGROUND]
+
+
+def test_class_cap_holds_back_only_that_class() -> None:
+    async def main() -> None:
+        rl = limiter(concurrency={Priority.BACKGROUND: 1})
+        entered = asyncio.Event()
+
+        async def second() -> None:
+            async with rl.slot(Priority.BACKGROUND):
+                entered.set()
+
+        async with rl.slot(Priority.BACKGROUND):
+            task = asyncio.ensure_future(second())
+            await asyncio.sleep(0.05)
+            assert not entered.is_set()
+            assert rl.waiting(Priority.BACKGROUND) == 1
+            # Other classes are not behind the cap
+            async with rl.slot(Priority.INTERACTIVE):
+                assert rl.in_flight(Priority.INTERACTIVE) == 1
+        await task
+        assert entered.is_set()
+        assert rl.in_flight(Priority.BACKGROUND) == 0
+
+    asyncio.run(main())
+
+
+def test_reserve_is_left_for_interactive() -> None:
+    async def main() -> None:
+        rl = limiter(
+            rate=0.001,
+            capacity=10,
+            reserve={Priority.BACKGROUND: 0.5},
+            class_max_wait={Priority.BACKGROUND: 1},
+        )
+        for _ in range(5):
+            await rl.acquire(Priority.BACKGROUND)
+        # Only the reserve is left: rejected straight away, without queueing
+        with pytest.raises(WowRateLimited):
+            await asyncio.wait_for(rl.acquire(Priority.BACKGROUND), 0.5)
+        assert rl.class_stats[Priority.BACKGROUND].rejected == 1
+        for _ in range(5):
+            await rl.acquire(Priority.INTERACTIVE)
+
+    asyncio.run(main())
+
+
+def test_queue_timeout_rejects() -> None:
+    async def main() -> None:
+        rl = limiter(concurrency={Priority.BACKGROUND: 1}, class_max_wait={Priority.BACKGROUND: 0.05})
+        async with rl.slot(Priority.BACKGROUND):
+            with pytest.raises(WowRateLimited):
+                async with rl.slot(Priority.BACKGROUND):
+                    pass
+            assert rl.in_flight(Priority.BACKGROUND) == 1
+            assert rl.queue_depth == 0
+        assert rl.in_flight(Priority.BACKGROUND) == 0
+
+    asyncio.run(main())
+
+
+def test_cancelled_waiter_does_not_leak_its_slot() -> None:
+    async def main() -> None:
+        rl = limiter(concurrency={Priority.BACKGROUND: 1})
+
+        async def second() -> None:
+            async with rl.slot(Priority.BACKGROUND):
+                await asyncio.sleep(10)
+
+        async with rl.slot(Priority.BACKGROUND):
+            task = asyncio.ensure_future(second())
+            await asyncio.sleep(0.01)
+        # The release lets the pump grant the waiter; cancel before it resumes
+        await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert rl.in_flight(Priority.BACKGROUND) == 0
+        async with rl.slot(Priority.BACKGROUND):
+            pass
+
+    asyncio.run(main())
+
+
+def test_cancelled_while_queued() -> None:
+    async def main() -> None:
+        rl = limiter(concurrency={Priority.BACKGROUND: 1})
+        async with rl.slot(Priority.BACKGROUND):
+            waiter = asyncio.ensure_future(rl.slot(Priority.BACKGROUND).__aenter__())
+            await asyncio.sleep(0.01)
+            waiter.cancel()
+            await asyncio.gather(waiter, return_exceptions=True)
+        assert rl.in_flight(Priority.BACKGROUND) == 0
+        assert rl.queue_depth == 0
+
+    asyncio.run(main())
+
+
+def test_escalation_reaches_nested_scopes_only() -> None:
+    with request_priority(Priority.BACKGROUND):
+        assert current_priority() is Priority.BACKGROUND
+        with shared_priority() as shared:
+            with request_priority(Priority.BATCH):
+                shared.escalate(Priority.INTERACTIVE)
+                assert current_priority() is Priority.INTERACTIVE
+        assert current_priority() is Priority.BACKGROUND
+    # An explicit lower priority is not raised by an unescalated parent
+    with request_priority(Priority.BACKGROUND):
+        assert current_priority() is Priority.BACKGROUND
+
+
+def test_interactive_joiner_escalates_queued_flight() -> None:
+    async def main() -> None:
+        rl = limiter(concurrency={Priority.BACKGROUND: 1})
+        flight: SingleFlight[str, str] = SingleFlight()
+
+        async def fetch() -> str:
+            async with rl.slot():
+                return "ok"
+
+        async with rl.slot(Priority.BACKGROUND):
+            with request_priority(Priority.BACKGROUND):
+                leader = asyncio.ensure_future(flight.do("k", fetch))
+            await asyncio.sleep(0.01)
+            assert rl.waiting(Priority.BACKGROUND) == 1
+            # Still holding the only background slot: only escalation lets it through
+            assert await asyncio.wait_for(flight.do("k", fetch), 1) == "ok"
+            assert await leader == "ok"
+        assert rl.in_flight(Priority.BACKGROUND) == 0
+        assert rl.in_flight(Priority.INTERACTIVE) == 0
+
+    asyncio.run(main())
+
+
+def test_escalated_waiter_gets_the_shorter_deadline() -> None:
+    async def main() -> None:
+        rl = limiter(concurrency={Priority.BACKGROUND: 1, Priority.INTERACTIVE: 0}, max_wait=0.05)
+        async with rl.slot(Priority.BACKGROUND):
+            with request_priority(Priority.BACKGROUND), shared_priority() as shared:
+                waiter = asyncio.ensure_future(rl.slot().__aenter__())
+            await asyncio.sleep(0.01)
+            # Queued with the 120s background deadline; escalated, it fails fast
+            shared.escalate(Priority.INTERACTIVE)
+            with pytest.raises(WowRateLimited):
+                await asyncio.wait_for(waiter, 1)
+            assert rl.class_stats[Priority.INTERACTIVE].rejected == 1
+
+    asyncio.run(main())
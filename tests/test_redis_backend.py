@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any
+
+import pytest
+
+from gwydeonbot.utils.redis_backend import RedisBackend, RespConnection, RespError
+
+
+async def read(data: bytes) -> Any:
+    reader = asyncio.StreamReader()
+    reader.feed_data(data)
+    reader.feed_eof()
+    return await RespConnection._read_reply(reader)
+
+
+@pytest.mark.parametrize(
+    ("data", "expected"),
+    [
+        (b"+OK\r\n", "OK"),
+        (b":42\r\n", 42),
+        (b"$5\r\nhe\r\no\r\n", b"he\r\no"),
+        (b"$0\r\n\r\n", b""),
+        (b"$-1\r\n", None),
+        (b"*-1\r\n", None),
+        (b"*3\r\n$1\r\na\r\n$-1\r\n:7\r\n", [b"a", None, 7]),
+    ],
+)
+def test_replies(data: bytes, expected: Any) -> None:
+    assert asyncio.run(read(data)) == expected
+
+
+def test_error_reply_is_returned_not_raised() -> None:
+    reply = asyncio.run(read(b"-ERR wrong type\r\n"))
+    assert isinstance(reply, RespError)
+    assert str(reply) == "ERR wrong type"
+
+
+def test_bad_reply() -> None:
+    with pytest.raises(ValueError):
+        asyncio.run(read(b"?what\r\n"))
+
+
+def test_encode() -> None:
+    assert RespConnection._encode(["SET", "k", b"v\r\n", "PX", 1000]) == (
+        b"*5\r\n$3\r\nSET\r\n$1\r\nk\r\n$3\r\nv\r\n\r\n$2\r\nPX\r\n$4\r\n1000\r\n"
+    )
+
+
+class FakeRedis:
+    """GET/SET/MGET over RESP; GETs of keys starting with "slow" answer late."""
+
+    def __init__(self) -> None:
+        self.data: dict[bytes, bytes] = {}
+        self.connections = 0
+
+    async def start(self) -> str:
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        port = self._server.sockets[0].getsockname()[1]
+        return f"redis://127.0.0.1:{port}/0"
+
+    async def close(self) -> None:
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        try:
+            while True:
+                cmd = await RespConnection._read_reply(reader)
+                name = cmd[0].upper()
+                if name == b"GET":
+                    if cmd[1].startswith(b"slow"):
+                        await asyncio.sleep(0.2)
+                    value = self.data.get(cmd[1])
+                    writer.write(b"$-1\r\n" if value is None else b"$%d\r\n%s\r\n" % (len(value), value))
+                elif name == b"MGET":
+                    writer.write(b"*%d\r\n" % (len(cmd) - 1))
+                    for key in cmd[1:]:
+                        value = self.data.get(key)
+                        writer.write(b"$-1\r\n" if value is None else b"$%d\r\n%s\r\n" % (len(value), value))
+                elif name == b"SET":
+                    self.data[cmd[1]] = cmd[2]
+                    writer.write(b"+OK\r\n")
+                else:
+                    writer.write(b"-ERR unknown command\r\n")
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+
+def test_pipeline_round_trip() -> None:
+    async def main() -> None:
+        server = FakeRedis()
+        conn = RespConnection.from_url(await server.start())
+        try:
+            replies = await conn.pipeline([["SET", "a", b"1"], ["GET", "a"], ["GET", "b"], ["NOPE"]])
+            assert replies[:3] == ["OK", b"1", None]
+            assert isinstance(replies[3], RespError)
+        finally:
+            await conn.close()
+            await server.close()
+
+    asyncio.run(main())
+
+
+def test_cancelled_pipeline_does_not_desync_the_next_one() -> None:
+    async def main() -> None:
+        server = FakeRedis()
+        server.data.update({b"slow": b"stale", b"a": b"1", b"b": b"2"})
+        conn = RespConnection.from_url(await server.start())
+        try:
+            # Written, then cancelled before its reply arrives
+            task = asyncio.ensure_future(conn.pipeline([["GET", "a"], ["GET", "slow"]]))
+            await asyncio.sleep(0.05)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            assert await conn.pipeline([["GET", "b"]]) == [b"2"]
+            assert server.connections == 2
+        finally:
+            await conn.close()
+            await server.close()
+
+    asyncio.run(main())
+
+
+def test_backend_batches() -> None:
+    async def main() -> None:
+        server = FakeRedis()
+        backend = RedisBackend(await server.start())
+        try:
+            await backend.set_many([("k1", b"v1", 60), ("k2", b"v2", 60)])
+            assert await backend.get_many(["k1", "missing", "k2"]) == [b"v1", None, b"v2"]
+        finally:
+            await backend.close()
+            await server.close()
+
+    asyncio.run(main())
+
+
+def test_backend_down_degrades_to_misses() -> None:
+    async def main() -> None:
+        backend = RedisBackend("redis://127.0.0.1:9/0", timeout=0.5)
+        assert await backend.get_many(["k"]) == [None]
+        await backend.set_many([("k", b"v", 60)])
+        await backend.close()
+
+    asyncio.run(main())
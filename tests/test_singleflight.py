@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from gwydeonbot.utils.aio import gather_or_cancel
+from gwydeonbot.utils.singleflight import SingleFlight
+
+
+class Upstream:
+    def __init__(self) -> None:
+        self.calls = 0
+        self.cancelled = 0
+
+    async def fetch(self) -> str:
+        self.calls += 1
+        try:
+            await asyncio.sleep(0.1)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return "ok"
+
+
+def test_call_survives_while_a_waiter_is_left() -> None:
+    async def main() -> None:
+        upstream = Upstream()
+        flight: SingleFlight[str, str] = SingleFlight()
+        first = asyncio.ensure_future(flight.do("k", upstream.fetch))
+        second = asyncio.ensure_future(flight.do("k", upstream.fetch))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        assert await second == "ok"
+        assert (upstream.calls, upstream.cancelled) == (1, 0)
+
+    asyncio.run(main())
+
+
+def test_last_waiter_leaving_cancels_the_call() -> None:
+    async def main() -> None:
+        upstream = Upstream()
+        flight: SingleFlight[str, str] = SingleFlight()
+        waiters = [asyncio.ensure_future(flight.do("k", upstream.fetch)) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        for w in waiters:
+            w.cancel()
+        await asyncio.gather(*waiters, return_exceptions=True)
+        assert "k" not in flight
+        # A caller arriving meanwhile starts afresh instead of joining the cancelled call
+        assert await flight.do("k", upstream.fetch) == "ok"
+        assert (upstream.calls, upstream.cancelled) == (2, 1)
+
+    asyncio.run(main())
+
+
+def test_cancelled_gather_does_not_leave_requests_behind() -> None:
+    async def main() -> None:
+        upstream = Upstream()
+        flight: SingleFlight[str, str] = SingleFlight()
+        task = asyncio.ensure_future(gather_or_cancel(flight.do("a", upstream.fetch), flight.do("b", upstream.fetch)))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        await asyncio.sleep(0)
+        assert upstream.cancelled == 2
+        assert len(flight) == 0
+
+    asyncio.run(main())